@@ -1,6 +1,8 @@
+import queue
+import threading
 import tkinter as tk
 from tkinter import ttk
-from odoo_generator import OdooModuleGenerator
+from odoo_generator import FieldSpec, ModelSpec, OdooModuleGenerator
 
 class ModuleGeneratorApp(tk.Tk):
     def __init__(self):
@@ -11,6 +13,10 @@ class ModuleGeneratorApp(tk.Tk):
         self.module_info = {'name': '', 'version': '', 'category': '', 'summary': '', 'dependencies': ''}
         self.models = []
 
+        self.generator = None
+        self.generation_thread = None
+        self.generation_events = queue.Queue()
+
         self.main_menu = MainMenu(self)
         self.module_info_screen = ModuleInfo(self)
         self.model_info_screen = ModelInfo(self)
@@ -51,12 +57,55 @@ class ModuleGeneratorApp(tk.Tk):
             widget.pack_forget()
 
     def generate_module(self):
-        generator = OdooModuleGenerator(self.module_info['name'])
-        generator.model_names = [model['name'] for model in self.models]
-        generator.model_fields = {model['name']: {field['name']: field['type'] for field in model['fields']} for model in self.models}
-        result_message = generator.generate_module()
+        if self.generation_thread is not None:
+            return
+        try:
+            generator = OdooModuleGenerator(self.module_info['name'], progress_callback=self.queue_progress)
+        except ValueError as e:
+            self.show_result(str(e))
+            return
+        generator.spec.models = list(self.models)
+        self.generator = generator
+        self.review_screen.start_progress(len(self.models))
+        # Generation runs in a worker thread; it only talks to Tk through the
+        # event queue, which poll_generation drains on the main loop.
+        self.generation_thread = threading.Thread(target=self.run_generation, args=(generator,), daemon=True)
+        self.generation_thread.start()
+        self.after(50, self.poll_generation)
+
+    def run_generation(self, generator):
+        self.generation_events.put(('done', generator.generate_module()))
+
+    def queue_progress(self, files_done, files_total, models_done):
+        self.generation_events.put(('progress', self.generator.phase, files_done, files_total, models_done))
+
+    def poll_generation(self):
+        result_message = None
+        progress = None
+        while True:
+            try:
+                event = self.generation_events.get_nowait()
+            except queue.Empty:
+                break
+            if event[0] == 'progress':
+                progress = event[1:]
+            else:
+                result_message = event[1]
+        if progress is not None:
+            self.review_screen.set_progress(*progress)
+        if result_message is None:
+            self.after(50, self.poll_generation)
+            return
+        self.generation_thread.join()
+        self.generation_thread = None
+        self.generator = None
+        self.review_screen.stop_progress()
         self.show_result(result_message)
 
+    def cancel_generation(self):
+        if self.generator is not None:
+            self.generator.cancel()
+
     def update_review_screen(self):
         self.review_screen.update_widgets()
 
@@ -158,7 +207,7 @@ class ModelInfo(tk.Frame):
             def save_field():
                 field_name = field_name_entry.get()
                 field_type = field_type_entry.get()
-                fields.append({"name": field_name, "type": field_type})
+                fields.append(FieldSpec(field_name, field_type))
                 new_field_window.destroy()
 
             tk.Button(frame, text="Save Field", command=save_field).pack(pady=10)
@@ -167,7 +216,7 @@ class ModelInfo(tk.Frame):
 
         def save_model():
             model_name = model_name_entry.get()
-            self.master.models.append({"name": model_name, "fields": fields})
+            self.master.models.append(ModelSpec(model_name, fields))
             new_model_window.destroy()
 
         tk.Button(frame, text="Save Model", command=save_model).pack(pady=10)
@@ -181,35 +230,95 @@ class Review(tk.Frame):
     def create_widgets(self):
         self.module_info_frame = tk.Frame(self)
         self.module_info_frame.pack(pady=10)
-        
+
+        tk.Label(self.module_info_frame, text="Review and Confirm", font=("Arial", 18)).pack(pady=10)
+        self.module_info_labels = {}
+        for key in ('name', 'version', 'category', 'summary', 'dependencies'):
+            self.module_info_labels[key] = tk.Label(self.module_info_frame, text="")
+            self.module_info_labels[key].pack(anchor="w")
+
         self.models_frame = tk.Frame(self)
-        self.models_frame.pack(pady=10)
+        self.models_frame.pack(pady=10, fill="both", expand=True)
+
+        # A single Treeview (models as parents, fields as children) only draws
+        # the visible rows, so large specs stay cheap to review.
+        self.models_tree = ttk.Treeview(self.models_frame, columns=("type",), height=8)
+        self.models_tree.heading("#0", text="Model / Field")
+        self.models_tree.heading("type", text="Field Type")
+        scrollbar = ttk.Scrollbar(self.models_frame, orient="vertical", command=self.models_tree.yview)
+        self.models_tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side="right", fill="y")
+        self.models_tree.pack(side="left", fill="both", expand=True)
+        # (model snapshot, tree item) for each model row, in display order
+        self.model_rows = []
 
         self.buttons_frame = tk.Frame(self)
         self.buttons_frame.pack(pady=10)
 
-        tk.Button(self.buttons_frame, text="Confirm", command=self.master.generate_module).pack(side="left", padx=5)
-        tk.Button(self.buttons_frame, text="Back", command=self.master.show_model_info).pack(side="left", padx=5)
+        self.confirm_button = tk.Button(self.buttons_frame, text="Confirm", command=self.master.generate_module)
+        self.confirm_button.pack(side="left", padx=5)
+        self.back_button = tk.Button(self.buttons_frame, text="Back", command=self.master.show_model_info)
+        self.back_button.pack(side="left", padx=5)
+
+        self.progress_frame = tk.Frame(self)
+        self.progress_bar = ttk.Progressbar(self.progress_frame, orient="horizontal", mode="determinate", length=300)
+        self.progress_bar.pack(pady=5)
+        self.progress_label = tk.Label(self.progress_frame, text="")
+        self.progress_label.pack()
+        self.cancel_button = tk.Button(self.progress_frame, text="Cancel", command=self.master.cancel_generation)
+        self.cancel_button.pack(pady=5)
+
+    def start_progress(self, models_total):
+        self.models_total = models_total
+        self.confirm_button.config(state="disabled")
+        self.back_button.config(state="disabled")
+        self.cancel_button.config(state="normal")
+        self.progress_bar.config(value=0, maximum=1)
+        self.progress_label.config(text="Generating...")
+        self.progress_frame.pack(pady=10)
+
+    def set_progress(self, phase, files_done, files_total, models_done):
+        self.progress_bar.config(value=files_done, maximum=files_total)
+        if phase == 'writing':
+            text = f"Writing: {files_done}/{files_total} files written"
+        else:
+            text = f"Rendering: {files_done}/{files_total} files rendered, {models_done}/{self.models_total} models done"
+        self.progress_label.config(text=text)
+
+    def stop_progress(self):
+        self.progress_frame.pack_forget()
+        self.confirm_button.config(state="normal")
+        self.back_button.config(state="normal")
 
     def update_widgets(self):
-        for widget in self.module_info_frame.winfo_children():
-            widget.destroy()
-        for widget in self.models_frame.winfo_children():
-            widget.destroy()
-
-        tk.Label(self.module_info_frame, text="Review and Confirm", font=("Arial", 18)).pack(pady=10)
-        
-        tk.Label(self.module_info_frame, text=f"Module Name: {self.master.module_info['name']}").pack(anchor="w")
-        tk.Label(self.module_info_frame, text=f"Version: {self.master.module_info['version']}").pack(anchor="w")
-        tk.Label(self.module_info_frame, text=f"Category: {self.master.module_info['category']}").pack(anchor="w")
-        tk.Label(self.module_info_frame, text=f"Summary: {self.master.module_info['summary']}").pack(anchor="w")
-        tk.Label(self.module_info_frame, text=f"Dependencies: {self.master.module_info['dependencies']}").pack(anchor="w")
-        
-        for model in self.master.models:
-            tk.Label(self.models_frame, text=f"Model Name: {model['name']}").pack(anchor="w")
-            for field in model["fields"]:
-                tk.Label(self.models_frame, text=f"  Field Name: {field['name']}, Field Type: {field['type']}").pack(anchor="w")
-
+        module_info = self.master.module_info
+        self.module_info_labels['name'].config(text=f"Module Name: {module_info['name']}")
+        self.module_info_labels['version'].config(text=f"Version: {module_info['version']}")
+        self.module_info_labels['category'].config(text=f"Category: {module_info['category']}")
+        self.module_info_labels['summary'].config(text=f"Summary: {module_info['summary']}")
+        self.module_info_labels['dependencies'].config(text=f"Dependencies: {module_info['dependencies']}")
+
+        self.update_models_tree()
+
+    def update_models_tree(self):
+        # Only rows whose model changed since the last review are rebuilt.
+        models = self.master.models
+        for index, model in enumerate(models):
+            snapshot = (model.name, tuple((field.name, field.type) for field in model.fields))
+            if index < len(self.model_rows):
+                if self.model_rows[index][0] == snapshot:
+                    continue
+                self.models_tree.delete(self.model_rows[index][1])
+            item = self.models_tree.insert("", index, text=model.name, values=("",), open=True)
+            for field_name, field_type in snapshot[1]:
+                self.models_tree.insert(item, "end", text=field_name, values=(field_type,))
+            if index < len(self.model_rows):
+                self.model_rows[index] = (snapshot, item)
+            else:
+                self.model_rows.append((snapshot, item))
+        for snapshot, item in self.model_rows[len(models):]:
+            self.models_tree.delete(item)
+        del self.model_rows[len(models):]
 
 class Result(tk.Frame):
     def __init__(self, master):
@@ -0,0 +1,172 @@
+"""Benchmark module generation on synthetic specs.
+
+Usage: python benchmarks/bench_generate.py [--cases 100x10,1000x50] [--repeat N]
+                                           [--history FILE] [--threshold PCT] [--no-save]
+
+Each case ``<models>x<fields>`` times ``OdooModuleGenerator.generate_module``
+(writing to a temporary directory) and every builder rendering in memory.
+The best of ``--repeat`` runs is compared with the median of the last
+``--window`` runs recorded in the history file. The run exits with status 1
+when any measurement is more than ``--threshold`` percent slower.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from odoo_generator import (  # noqa: E402
+    FieldSpec, InitFileBuilder, ManifestBuilder, MemoryFileManager, MenuBuilder, ModelBuilder, ModuleSpec,
+    OdooModuleGenerator, SecurityBuilder, ViewBuilder
+)
+
+DEFAULT_CASES = '1x1,1x500,10x10,100x10,100x100,1000x10,1000x50,10000x1,10000x10'
+DEFAULT_HISTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'history.json')
+FIELD_TYPES = ['Char', 'Text', 'Integer', 'Float', 'Boolean', 'Date', 'Many2one']
+
+
+def parse_cases(text):
+    cases = []
+    for case in text.split(','):
+        models, fields = case.lower().split('x')
+        cases.append((int(models), int(fields)))
+    return cases
+
+
+def synthetic_spec(models, fields):
+    spec = ModuleSpec('bench_module')
+    for model_index in range(models):
+        spec.add_model(f'bench.model{model_index}', [
+            FieldSpec(f'field_{field_index}', FIELD_TYPES[field_index % len(FIELD_TYPES)])
+            for field_index in range(fields)
+        ])
+    return spec
+
+
+def best_of(repeat, function, min_sample=0.02):
+    # Like timeit's autorange: fast functions are looped so that every sample
+    # lasts at least min_sample seconds, keeping timer noise out of the history.
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_sample:
+            break
+        number *= 2
+    timings = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        timings.append((time.perf_counter() - start) / number)
+    return min(timings)
+
+
+def benchmark_case(models, fields, repeat):
+    spec = synthetic_spec(models, fields)
+    model_names = [model.name for model in spec.models]
+    memory = MemoryFileManager(spec.name)
+
+    def generate_module():
+        with tempfile.TemporaryDirectory() as tmp:
+            cwd = os.getcwd()
+            os.chdir(tmp)
+            try:
+                message = OdooModuleGenerator.from_spec(spec).generate_module()
+            finally:
+                os.chdir(cwd)
+        if 'successfully' not in message:
+            raise RuntimeError(message)
+
+    def init_files():
+        builder = InitFileBuilder(spec.name, model_names, memory)
+        builder.build_module_init()
+        builder.build_models_init()
+
+    def model_files():
+        for model in spec.models:
+            ModelBuilder(spec.name, model, memory).render_model_file()
+
+    def view_files():
+        for model in spec.models:
+            ViewBuilder(spec.name, model, memory).render_view_file()
+
+    return {
+        'generate_module': best_of(repeat, generate_module),
+        'ManifestBuilder': best_of(repeat, lambda: ManifestBuilder(spec.name, model_names, memory).build_manifest()),
+        'ModelBuilder': best_of(repeat, model_files),
+        'ViewBuilder': best_of(repeat, view_files),
+        'SecurityBuilder': best_of(repeat, lambda: SecurityBuilder(spec.name, model_names, memory).build_security_file()),
+        'InitFileBuilder': best_of(repeat, init_files),
+        'MenuBuilder': best_of(repeat, lambda: MenuBuilder(spec.name, model_names, memory).build_menus()),
+    }
+
+
+def load_history(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+
+def baseline(history, key, window):
+    previous = [run['results'][key] for run in history if key in run['results']][-window:]
+    return statistics.median(previous) if previous else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Odoo module generation.")
+    parser.add_argument('--cases', default=DEFAULT_CASES, help="Comma separated <models>x<fields> cases.")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per measurement; the best one is kept.")
+    parser.add_argument('--history', default=DEFAULT_HISTORY, help="JSON file holding previous runs.")
+    parser.add_argument('--window', type=int, default=5, help="Number of previous runs forming the baseline.")
+    parser.add_argument('--threshold', type=float, default=10.0, help="Allowed slowdown in percent.")
+    parser.add_argument('--no-save', action='store_true', help="Do not append this run to the history.")
+    args = parser.parse_args(argv)
+
+    history = load_history(args.history)
+    results = {}
+    regressions = []
+    print(f"{'case':<12} {'measurement':<16} {'ms':>10} {'baseline':>10} {'change':>8}")
+    for models, fields in parse_cases(args.cases):
+        case = f'{models}x{fields}'
+        for name, seconds in benchmark_case(models, fields, args.repeat).items():
+            key = f'{case}/{name}'
+            results[key] = seconds
+            reference = baseline(history, key, args.window)
+            if reference:
+                change = (seconds - reference) / reference * 100
+                flag = ' REGRESSION' if change > args.threshold else ''
+                if flag:
+                    regressions.append(key)
+                print(f"{case:<12} {name:<16} {seconds * 1000:>10.3f} {reference * 1000:>10.3f} {change:>+7.1f}%{flag}")
+            else:
+                print(f"{case:<12} {name:<16} {seconds * 1000:>10.3f} {'-':>10} {'-':>8}")
+
+    if not args.no_save:
+        history.append({
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'results': results,
+        })
+        with open(args.history, 'w') as f:
+            json.dump(history, f, indent=2)
+
+    if regressions:
+        print(f"{len(regressions)} measurement(s) regressed by more than {args.threshold:g}%.", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""Measure the speedup of the per-model render pool by worker count.
+
+Usage: python benchmarks/bench_parallel.py [--case 2000x20] [--jobs 1,2,4,8] [--repeat N]
+
+Renders one synthetic ``<models>x<fields>`` module in memory with
+``OdooModuleGenerator.render_files`` (no disk I/O, no render cache), first
+serially and then on thread and process pools of each ``--jobs`` size, and
+reports the best time of each and its speedup over the serial run. By
+default the worker counts are the powers of two up to the CPU count.
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from odoo_generator import OdooModuleGenerator  # noqa: E402
+from bench_generate import parse_cases, synthetic_spec  # noqa: E402
+
+
+def default_jobs():
+    cpus = os.cpu_count() or 1
+    jobs = [1]
+    while jobs[-1] * 2 <= cpus:
+        jobs.append(jobs[-1] * 2)
+    if jobs[-1] != cpus:
+        jobs.append(cpus)
+    return jobs
+
+
+def best_time(repeat, spec, **options):
+    timings = []
+    for _ in range(repeat):
+        generator = OdooModuleGenerator.from_spec(spec, **options)
+        start = time.perf_counter()
+        generator.render_files()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure the render pool speedup by worker count.")
+    parser.add_argument('--case', default='2000x20', help="<models>x<fields> module to render.")
+    parser.add_argument('--jobs', help="Comma separated worker counts (default: powers of two up to the CPU count).")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per measurement; the best one is kept.")
+    args = parser.parse_args(argv)
+
+    (models, fields), = parse_cases(args.case)
+    jobs = [int(count) for count in args.jobs.split(',')] if args.jobs else default_jobs()
+    spec = synthetic_spec(models, fields)
+
+    serial = best_time(args.repeat, spec)
+    print(f"{args.case} on {os.cpu_count()} CPUs")
+    print(f"{'pool':<8} {'jobs':>4} {'ms':>10} {'speedup':>8}")
+    print(f"{'serial':<8} {1:>4} {serial * 1000:10.1f} {1.0:7.2f}x")
+    for pool in OdooModuleGenerator.RENDER_POOLS:
+        for count in jobs:
+            if count < 2:
+                continue
+            elapsed = best_time(args.repeat, spec, render_jobs=count, render_pool=pool)
+            print(f"{pool:<8} {count:>4} {elapsed * 1000:10.1f} {serial / elapsed:7.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
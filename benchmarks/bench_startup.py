@@ -0,0 +1,57 @@
+"""Measure the cold start of the ``odoo-gen`` command-line entry point.
+
+Usage: python benchmarks/bench_startup.py [--runs N] [--budget-ms MS]
+
+Each run starts a fresh interpreter and verifies a one-model module, the
+typical call from a build script, so the number includes Python's own
+startup; the bare interpreter time is reported alongside for reference.
+Exits with status 1 when the median start exceeds the budget.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+SPEC = {'name': 'startup_module', 'models': [{'name': 'startup_model', 'fields': {'name': 'Char'}}]}
+
+
+def median_ms(command, runs, cwd):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=cwd, stdout=subprocess.DEVNULL, check=True)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure odoo-gen cold start time.")
+    parser.add_argument('--runs', type=int, default=21)
+    parser.add_argument('--budget-ms', type=float, default=50.0)
+    args = parser.parse_args(argv)
+
+    odoo_gen = [sys.executable, os.path.join(ROOT, 'odoo-gen')]
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.path.join(tmp, 'spec.json'), 'w') as f:
+            json.dump(SPEC, f)
+        # Also warms the bytecode cache so no run pays for compilation.
+        subprocess.run(odoo_gen + ['generate', 'spec.json'], cwd=tmp, stdout=subprocess.DEVNULL, check=True)
+
+        interpreter = median_ms([sys.executable, '-c', 'pass'], args.runs, tmp)
+        cli = median_ms(odoo_gen + ['verify', 'spec.json'], args.runs, tmp)
+
+    print(f"python -c pass:  {interpreter:6.1f} ms")
+    print(f"odoo-gen verify: {cli:6.1f} ms (+{cli - interpreter:.1f} ms, budget {args.budget_ms:.0f} ms"
+          f"{', over budget' if cli > args.budget_ms else ''})")
+    return 0 if cli <= args.budget_ms else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
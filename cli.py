@@ -0,0 +1,305 @@
+import argparse
+import json
+import os
+import sys
+
+from odoo_generator import (
+    BatchGenerator, GenerationJournal, Instrumentation, JsonLinesSink, ModuleSpec, OdooModuleGenerator, RenderCache,
+    TimingSummary, load_module_specs
+)
+from templates import TemplateLoader, default_template_cache_dir
+
+# Keep this module free of GUI and other heavy imports: build scripts invoke
+# it thousands of times, so cold start matters (see benchmarks/bench_startup.py).
+
+
+def cache_dir(args):
+    if args.cache_dir:
+        return args.cache_dir
+    if args.cache:
+        return RenderCache.default_cache_dir()
+    return None
+
+
+def template_loader(args):
+    # Compiled templates are kept on disk: each command is a new process.
+    return TemplateLoader(args.template_dir, cache_dir=default_template_cache_dir())
+
+
+def module_specs(args):
+    specs = load_module_specs(args.spec)
+    if args.module:
+        specs = [spec for spec in specs if spec.get('name') == args.module]
+        if not specs:
+            raise SystemExit(f"Module {args.module} not found in {args.spec}")
+    return specs
+
+
+def generators(args, **options):
+    directory = cache_dir(args)
+    render_cache = RenderCache(directory) if directory is not None else None
+    options['templates'] = template_loader(args)
+    try:
+        return [OdooModuleGenerator.from_spec(spec, render_cache, **options) for spec in module_specs(args)]
+    except (ValueError, KeyError, TypeError) as e:
+        raise SystemExit(f"{args.spec}: {e}")
+
+
+def generate(args):
+    specs = module_specs(args)
+    if args.archive and args.addons_path:
+        raise SystemExit("--archive and --addons-path cannot be combined")
+    if args.archive and len(specs) != 1:
+        raise SystemExit("--archive needs a spec with a single module (use --module to pick one)")
+    if args.server:
+        return generate_remote(args, specs)
+    instrumentation = None
+    sink = summary = None
+    if args.trace or args.profile:
+        instrumentation = Instrumentation()
+        if args.trace:
+            sink = instrumentation.subscribe(JsonLinesSink(args.trace))
+        if args.profile:
+            summary = instrumentation.subscribe(TimingSummary())
+    status = 0
+    try:
+        for generator in generators(
+            args, instrumentation=instrumentation, write_jobs=args.write_jobs,
+            render_jobs=args.render_jobs, render_pool=args.render_pool,
+        ):
+            try:
+                file_manager = generator.build_module(args.archive, args.format, args.addons_path)
+            except Exception as e:
+                print(f"{generator.module_name}: {e}", file=sys.stderr)
+                status = 1
+                continue
+            print(
+                f"{generator.module_name}: {file_manager.written} files written, "
+                f"{file_manager.skipped} unchanged."
+            )
+            if args.io_stats and generator.io_report is not None:
+                print(f"  {generator.io_report.summary()}")
+    finally:
+        if sink is not None:
+            sink.close()
+    if summary is not None:
+        print(summary.report(args.profile))
+    return status
+
+
+def generate_remote(args, specs):
+    from odoo_generator import archive_format_for
+    from server import request
+
+    status = 0
+    for spec in specs:
+        name = spec.get('name', '')
+        try:
+            if args.archive:
+                with open(args.archive, 'wb') as f:
+                    result = request(args.server, spec, archive_format=args.format or archive_format_for(args.archive),
+                                     target=f)
+            else:
+                result = request(args.server, spec, addons_path=args.addons_path or os.getcwd())
+        except OSError as e:
+            raise SystemExit(f"Cannot reach the generation server at {args.server}: {e}")
+        if not result['ok']:
+            print(f"{name}: {result['error']}", file=sys.stderr)
+            status = 1
+            continue
+        print(f"{name}: {result['written']} files written, {result.get('skipped', 0)} unchanged.")
+    return status
+
+
+def serve(args):
+    from server import GenerationServer
+
+    server = GenerationServer(args.socket, cache_dir=cache_dir(args), template_dir=args.template_dir, jobs=args.jobs)
+    print(f"Listening on {args.socket}", flush=True)
+    server.run()
+    return 0
+
+
+def stream(args):
+    directory = cache_dir(args)
+    render_cache = RenderCache(directory) if directory is not None else None
+    templates = template_loader(args)
+    try:
+        generator = OdooModuleGenerator(args.module_name, render_cache, templates=templates)
+        generator.spec = ModuleSpec(args.module_name, odoo_version=args.odoo_version)
+        if args.input == '-':
+            file_manager = generator.build_from_lines(sys.stdin)
+        else:
+            with open(args.input, encoding='utf-8') as f:
+                file_manager = generator.build_from_lines(f)
+    except (OSError, ValueError) as e:
+        print(f"{args.module_name}: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if render_cache is not None:
+            render_cache.close()
+    print(
+        f"{args.module_name}: {generator.models_done} models, {file_manager.written} files written, "
+        f"{file_manager.skipped} unchanged."
+    )
+    return 0
+
+
+def batch(args):
+    report = BatchGenerator(
+        load_module_specs(args.spec), jobs=args.jobs, cache_dir=cache_dir(args), template_dir=args.template_dir,
+        journal_path=args.journal,
+    ).run()
+    for result in report.failed:
+        print(f"{result.module_name}: {result.error}", file=sys.stderr)
+    print(report.summary())
+    return 1 if report.failed else 0
+
+
+def watch(args):
+    from watch import SpecWatcher
+
+    directory = cache_dir(args)
+    render_cache = RenderCache(directory) if directory is not None else None
+    templates = template_loader(args)
+    watcher = SpecWatcher(args.spec, args.module, render_cache, templates, args.interval)
+
+    def report(update):
+        print(update.summary(), file=sys.stderr if update.error is not None else sys.stdout, flush=True)
+
+    print(f"Watching {args.spec}; press Ctrl+C to stop.", flush=True)
+    try:
+        watcher.run(report)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if render_cache is not None:
+            render_cache.close()
+    return 0
+
+
+def diff(args):
+    status = 0
+    summaries = []
+    for generator in generators(args):
+        module_diff = generator.diff()
+        if module_diff.has_changes:
+            status = 1
+        if args.json:
+            summaries.append(module_diff.summary())
+        else:
+            sys.stdout.writelines(module_diff.unified(args.context))
+    if args.json:
+        json.dump(summaries, sys.stdout, indent=2)
+        print()
+    return status
+
+
+def verify(args):
+    status = 0
+    for generator in generators(args):
+        module_diff = generator.diff()
+        for path in module_diff.added + module_diff.modified:
+            print(f"{path}: out of date", file=sys.stderr)
+        print(f"{generator.module_name}: {len(module_diff.unchanged)}/{len(module_diff.files)} files up to date.")
+        if module_diff.has_changes:
+            status = 1
+    return status
+
+
+def add_spec_arguments(parser, module=True, cache=True):
+    parser.add_argument('spec', help="JSON file with a module, a list of modules, or an object with a 'modules' key.")
+    if module:
+        parser.add_argument('--module', '-m', help="Only handle the module with this name.")
+    if cache:
+        parser.add_argument('--cache', action='store_true', help="Reuse rendered models and views from the render cache.")
+        parser.add_argument('--cache-dir', help="Render cache location (implies --cache).")
+    parser.add_argument('--template-dir',
+                        help="Directory of templates overriding the built-in ones (model.py, view.xml, ...).")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='odoo-gen', description="Generate Odoo modules from spec files.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    generate_parser = subparsers.add_parser('generate', help="Generate the modules of a spec file.")
+    add_spec_arguments(generate_parser)
+    generate_parser.add_argument('--archive', help="Write the module into this zip/tar archive instead of the current directory.")
+    generate_parser.add_argument('--format', help="Archive format (zip, tar, tar.gz, tar.bz2, tar.xz); guessed from --archive by default.")
+    generate_parser.add_argument('--addons-path',
+                                 help="Publish atomically into this addons directory instead of the current directory.")
+    generate_parser.add_argument('--write-jobs', type=int, default=1,
+                                 help="Threads writing files to disk (default: 1).")
+    generate_parser.add_argument('--render-jobs', type=int, default=1,
+                                 help="Workers rendering model and view files (default: 1).")
+    generate_parser.add_argument('--render-pool', choices=OdooModuleGenerator.RENDER_POOLS, default='process',
+                                 help="Pool used by --render-jobs (default: process). Rendering is pure Python and "
+                                      "holds the GIL, so a thread pool gives no speedup.")
+    generate_parser.add_argument('--io-stats', action='store_true',
+                                 help="Print syscall and byte counts of the write phase.")
+    generate_parser.add_argument('--server', metavar='SOCKET',
+                                 help="Let the generation server listening on this socket do the work.")
+    generate_parser.add_argument('--trace', help="Append instrumentation events to this JSON Lines file.")
+    generate_parser.add_argument('--profile', type=int, nargs='?', const=10, metavar='N',
+                                 help="Print the N slowest builders and files (default 10).")
+    generate_parser.set_defaults(func=generate)
+
+    batch_parser = subparsers.add_parser('batch', help="Generate every module listed in a spec file.")
+    add_spec_arguments(batch_parser, module=False)
+    batch_parser.add_argument('--jobs', '-j', type=int, default=None, help="Worker processes (default: CPU count).")
+    batch_parser.add_argument('--journal', nargs='?', const=GenerationJournal.DEFAULT_NAME, metavar='FILE',
+                              help="Journal completed work so an interrupted batch resumes where it stopped "
+                                   f"(default file: {GenerationJournal.DEFAULT_NAME}).")
+    batch_parser.set_defaults(func=batch)
+
+    stream_parser = subparsers.add_parser(
+        'stream', help="Generate a module from JSON Lines, one model per line, writing each model as it arrives."
+    )
+    stream_parser.add_argument('module_name', help="Name of the module to generate.")
+    stream_parser.add_argument('input', nargs='?', default='-', help="JSON Lines file (default: standard input).")
+    stream_parser.add_argument('--odoo-version', type=int, default=ModuleSpec.DEFAULT_ODOO_VERSION,
+                               help=f"Odoo major version the module targets (default: {ModuleSpec.DEFAULT_ODOO_VERSION}).")
+    stream_parser.add_argument('--cache', action='store_true', help="Reuse rendered models and views from the render cache.")
+    stream_parser.add_argument('--cache-dir', help="Render cache location (implies --cache).")
+    stream_parser.add_argument('--template-dir',
+                               help="Directory of templates overriding the built-in ones (model.py, view.xml, ...).")
+    stream_parser.set_defaults(func=stream)
+
+    serve_parser = subparsers.add_parser('serve', help="Serve generation requests on a Unix domain socket.")
+    serve_parser.add_argument('socket', help="Path of the socket to listen on.")
+    serve_parser.add_argument('--jobs', '-j', type=int, default=None, help="Generation threads (default: up to 4).")
+    serve_parser.add_argument('--cache', action='store_true', help="Keep rendered models and views in the render cache.")
+    serve_parser.add_argument('--cache-dir', help="Render cache location (implies --cache).")
+    serve_parser.add_argument('--template-dir',
+                              help="Directory of templates overriding the built-in ones (model.py, view.xml, ...).")
+    serve_parser.set_defaults(func=serve)
+
+    watch_parser = subparsers.add_parser(
+        'watch', help="Regenerate the models affected by each edit of a spec file until interrupted."
+    )
+    add_spec_arguments(watch_parser)
+    watch_parser.add_argument('--interval', type=float, default=0.25,
+                              help="Seconds between checks of the spec file (default: 0.25).")
+    watch_parser.set_defaults(func=watch)
+
+    diff_parser = subparsers.add_parser('diff', help="Show what generating would change, without writing.")
+    add_spec_arguments(diff_parser)
+    diff_parser.add_argument('--json', action='store_true',
+                             help="Print a JSON summary of added, modified and unchanged files instead of a diff.")
+    diff_parser.add_argument('--context', '-U', type=int, default=3, help="Lines of context in the diff (default: 3).")
+    diff_parser.set_defaults(func=diff)
+
+    verify_parser = subparsers.add_parser('verify', help="Check that generated modules on disk match the spec.")
+    add_spec_arguments(verify_parser)
+    verify_parser.set_defaults(func=verify)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
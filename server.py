@@ -0,0 +1,236 @@
+import json
+import os
+import signal
+import socket
+import struct
+import threading
+import time
+
+from odoo_generator import ARCHIVE_FORMATS, ModuleSpec, OdooModuleGenerator, RenderCache
+from templates import TemplateLoader, default_loader
+
+# asyncio and concurrent.futures are imported by the server only: clients are
+# short-lived processes and should not pay for them.
+
+# Protocol, one request per connection:
+#
+#   client -> server  one JSON line: {"spec": {...}, "addons_path": "..."}
+#                     or {"spec": {...}, "archive": "zip" | "tar.gz" | ...}
+#   server -> client  one JSON header line: {"ok": true, ...} or {"ok": false, "error": "..."}
+#
+# An archive follows an ok header as frames of a 4-byte big-endian length and
+# that many bytes, ended by an empty frame and a JSON trailer line with the
+# final result; a failure while streaming shows up in the trailer.
+
+FRAME_SIZE = 64 * 1024
+
+
+class ArchiveStream:
+    """Writable binary stream that hands archive bytes to the event loop.
+
+    Used from a worker thread: every ``FRAME_SIZE`` bytes are sent as one
+    frame and the thread waits for the socket to drain, so a slow client
+    slows its own generation down instead of filling memory.
+    """
+
+    def __init__(self, loop, writer):
+        self.loop = loop
+        self.writer = writer
+        self.buffer = bytearray()
+
+    def write(self, data):
+        self.buffer += data
+        if len(self.buffer) >= FRAME_SIZE:
+            self.flush()
+        return len(data)
+
+    def flush(self):
+        if self.buffer:
+            self._send(struct.pack('>I', len(self.buffer)) + bytes(self.buffer))
+            self.buffer.clear()
+
+    def finish(self, trailer):
+        self.flush()
+        self._send(struct.pack('>I', 0) + _json_line(trailer))
+
+    def _send(self, data):
+        import asyncio
+
+        asyncio.run_coroutine_threadsafe(self._write(data), self.loop).result()
+
+    async def _write(self, data):
+        self.writer.write(data)
+        await self.writer.drain()
+
+
+class GenerationServer:
+    """Generates modules for JSON requests received on a Unix domain socket.
+
+    Connections are handled by an asyncio event loop; generation itself runs
+    on a pool of ``jobs`` threads. Compiled templates are shared by every
+    request, and each worker thread keeps its own connection to the render
+    cache, so both stay warm for the life of the server.
+    """
+
+    def __init__(self, socket_path, cache_dir=None, template_dir=None, jobs=None):
+        self.socket_path = socket_path
+        self.cache_dir = cache_dir
+        self.templates = TemplateLoader(template_dir) if template_dir is not None else default_loader()
+        self.jobs = jobs or min(4, os.cpu_count() or 1)
+        self.requests = 0
+        self.ready = threading.Event()
+        self._local = threading.local()
+        self._loop = None
+        self._stopping = None
+
+    def run(self):
+        import asyncio
+
+        asyncio.run(self.serve())
+
+    async def serve(self):
+        import asyncio
+        from concurrent.futures import ThreadPoolExecutor
+
+        self._loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                self._loop.add_signal_handler(signum, self._stopping.set)
+            except (ValueError, RuntimeError):
+                # Not in the main thread: the embedding code calls stop().
+                break
+        self.executor = ThreadPoolExecutor(self.jobs, thread_name_prefix='odoo-gen')
+        server = await asyncio.start_unix_server(self.handle, path=self.socket_path)
+        try:
+            async with server:
+                self.ready.set()
+                await self._stopping.wait()
+        finally:
+            self.executor.shutdown(wait=True)
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    def stop(self):
+        """Stop accepting requests; safe to call from any thread."""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._stopping.set)
+
+    async def handle(self, reader, writer):
+        self.requests += 1
+        try:
+            try:
+                request = json.loads(await reader.readline())
+                generator = self._generator(request['spec'])
+            except (ValueError, KeyError, TypeError) as e:
+                writer.write(_json_line({'ok': False, 'error': f"Invalid request: {e}"}))
+                return
+            if request.get('archive'):
+                await self._stream_archive(generator, request['archive'], writer)
+            else:
+                writer.write(_json_line(await self._loop.run_in_executor(
+                    self.executor, self._publish, generator, request.get('addons_path') or os.getcwd()
+                )))
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def _generator(self, spec):
+        if not isinstance(spec, dict) or not spec.get('name'):
+            raise ValueError("the spec needs a module name")
+        return OdooModuleGenerator.from_spec(ModuleSpec.from_dict(spec), templates=self.templates)
+
+    def _render_cache(self):
+        # sqlite3 connections belong to the thread that opened them.
+        if self.cache_dir is None:
+            return None
+        render_cache = getattr(self._local, 'render_cache', None)
+        if render_cache is None:
+            render_cache = self._local.render_cache = RenderCache(self.cache_dir)
+        return render_cache
+
+    def _publish(self, generator, addons_path):
+        start = time.perf_counter()
+        generator.render_cache = self._render_cache()
+        try:
+            file_manager = generator.build_module(addons_path=addons_path)
+        except Exception as e:
+            return {'ok': False, 'error': str(e)}
+        return {
+            'ok': True,
+            'path': os.path.abspath(os.path.join(addons_path, generator.module_name)),
+            'written': file_manager.written,
+            'skipped': file_manager.skipped,
+            'elapsed': time.perf_counter() - start,
+        }
+
+    async def _stream_archive(self, generator, archive_format, writer):
+        if archive_format not in ARCHIVE_FORMATS:
+            writer.write(_json_line({'ok': False, 'error': f"Unsupported archive format: {archive_format}"}))
+            return
+        writer.write(_json_line({'ok': True, 'format': archive_format}))
+        stream = ArchiveStream(self._loop, writer)
+        await self._loop.run_in_executor(self.executor, self._build_archive, generator, archive_format, stream)
+
+    def _build_archive(self, generator, archive_format, stream):
+        start = time.perf_counter()
+        generator.render_cache = self._render_cache()
+        try:
+            file_manager = generator.build_module(archive=stream, archive_format=archive_format)
+        except ConnectionError:
+            raise
+        except Exception as e:
+            trailer = {'ok': False, 'error': str(e)}
+        else:
+            trailer = {'ok': True, 'written': file_manager.written, 'elapsed': time.perf_counter() - start}
+        stream.finish(trailer)
+
+
+def request(socket_path, spec, addons_path=None, archive_format=None, target=None, timeout=None):
+    """Send one generation request to a running server and return its result.
+
+    With ``archive_format`` the archive is written to ``target``, a writable
+    binary stream, as it arrives; otherwise the module is published into
+    ``addons_path`` (the server's working directory by default).
+    """
+    if isinstance(spec, ModuleSpec):
+        spec = spec.to_dict()
+    payload = {'spec': spec}
+    if archive_format is not None:
+        payload['archive'] = archive_format
+    elif addons_path is not None:
+        payload['addons_path'] = os.path.abspath(addons_path)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.settimeout(timeout)
+        connection.connect(socket_path)
+        connection.sendall(_json_line(payload))
+        with connection.makefile('rb') as response:
+            header = _read_json(response)
+            if archive_format is None or not header['ok']:
+                return header
+            while True:
+                size, = struct.unpack('>I', _read_exactly(response, 4))
+                if not size:
+                    break
+                target.write(_read_exactly(response, size))
+            return _read_json(response)
+
+
+def _json_line(data):
+    return json.dumps(data).encode('utf-8') + b'\n'
+
+
+def _read_json(stream):
+    line = stream.readline()
+    if not line:
+        raise ConnectionError("the server closed the connection")
+    return json.loads(line)
+
+
+def _read_exactly(stream, size):
+    data = stream.read(size)
+    if len(data) != size:
+        raise ConnectionError("the server closed the connection mid-archive")
+    return data
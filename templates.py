@@ -0,0 +1,551 @@
+import builtins
+import os
+import sys
+
+# ast and re are imported by Template.compile only. Compiled templates are
+# cached on disk (see TemplateLoader), so a CLI run usually loads them with
+# marshal instead of compiling them again.
+
+
+MODULE_INIT_TEMPLATE = """\
+from . import models
+"""
+
+MODELS_INIT_TEMPLATE = """\
+{% for model_name in model_names %}
+from . import {{ model_name }}
+{% endfor %}
+"""
+
+MANIFEST_TEMPLATE = """
+{
+    'name': '{{ module_name }}',
+    'version': '1.0',
+    'category': 'Category',
+    'summary': 'Summary',
+    'depends': ['base', 'contacts'],
+    'data': [
+        'security/ir.model.access.csv',
+{% for model_name in model_names %}
+        'views/{{ model_name }}_views.xml',
+{% endfor %}
+        'views/menus.xml',
+    ],
+    'installable': True,
+    'application': True,
+}
+"""
+
+MODEL_TEMPLATE = '''
+{% set computed_fields = model.computed_fields %}
+from odoo import {% if model.batch_overrides or computed_fields %}api, {% endif %}fields, models
+{% if model.indexes %}
+from odoo.tools.sql import create_index
+{% endif %}
+
+class {{ model.name.capitalize().replace('.', '') }}(models.Model):
+    """This model is used for {{ model.name.replace('_', ' ') }}."""
+    _name = '{{ model.name }}'
+    _description = "{{ model.name.replace('_', ' ').capitalize() }}"
+
+{% for field in model.fields %}
+{% set index = field.effective_index %}
+    {{ field.name }} = fields.{{ field.type }}(string='{{ field.name.capitalize() }}'{% if field.compute %}, compute='_compute_{{ field.name }}'{% if field.compute.store %}, store=True{% endif %}{% endif %}{% if index %}, index={{ repr(index) }}{% endif %})
+{% endfor %}
+{% if model.indexes %}
+
+    def init(self):
+        super().init()
+{% for index in model.indexes %}
+        create_index(self.env.cr, {{ repr(index.index_name(model.name)) }}, self._table, {{ repr(index.fields) }}{% if index.method != 'btree' %}, method={{ repr(index.method) }}{% endif %}{% if index.where %}, where={{ repr(index.where) }}{% endif %})
+{% endfor %}
+{% endif %}
+{% for field in computed_fields %}
+{% set compute = field.compute %}
+
+    @api.depends({{ ', '.join(repr(path) for path in compute.depends) }})
+    def _compute_{{ field.name }}(self):
+{% if compute.aggregate %}
+        # One grouped query for the whole recordset instead of reading
+        # {{ compute.one2many }} record by record.
+        values = dict(self.env[{{ repr(compute.comodel) }}]._read_group(
+            [({{ repr(compute.inverse) }}, 'in', self.ids)], [{{ repr(compute.inverse) }}], [{{ repr(compute.aggregate_spec) }}],
+        ))
+        for record in self:
+            record.{{ field.name }} = values.get(record, 0)
+{% else %}
+        # Called once for every record to recompute; the dependencies are
+        # prefetched for all of them, so reading them here costs no query
+        # per record.
+        for record in self:
+            record.{{ field.name }} = False
+{% endif %}
+{% endfor %}
+{% if model.batch_overrides %}
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        # Called once per batch: prepare ``vals_list`` as a whole here, then
+        # post-process ``records`` with recordset operations, not a loop.
+        records = super().create(vals_list)
+        return records
+
+    def write(self, vals):
+        # ``self`` is every record being updated with the same ``vals``:
+        # work on it as a recordset so the batch stays a single UPDATE.
+        result = super().write(vals)
+        return result
+{% endif %}
+
+'''
+
+VIEW_TEMPLATE = """\
+<?xml version="1.0" encoding="UTF-8"?>
+<odoo>
+{% set view_id = model.name.replace('.', '') %}
+{% set title = model.name.replace('.', ' ').capitalize() %}
+    <record id="{{ view_id }}_view_form" model="ir.ui.view">
+        <field name="name">{{ model.name }}.view.form</field>
+        <field name="model">{{ model.name }}</field>
+        <field name="priority" eval="8"/>
+        <field name="arch" type="xml">
+            <form string="{{ title }}">
+                <sheet>
+                    <group>
+{% for field in model.fields %}
+                        <field name='{{ field.name }}'/>
+{% endfor %}
+                    </group>
+                </sheet>
+            </form>
+        </field>
+    </record>
+
+    <record id="{{ view_id }}_view_list" model="ir.ui.view">
+        <field name="name">{{ model.name }}.view.list</field>
+        <field name="model">{{ model.name }}</field>
+        <field name="arch" type="xml">
+            <{{ list_tag }} string="{{ title }}" limit="{{ model.list_view.limit }}">
+{% for field in model.list_fields %}
+                <field name='{{ field.name }}'{% if field.heavy %} optional="hide"{% endif %}/>
+{% endfor %}
+            </{{ list_tag }}>
+        </field>
+    </record>
+
+    <record id="{{ view_id }}_view_search" model="ir.ui.view">
+        <field name="name">{{ model.name }}.view.search</field>
+        <field name="model">{{ model.name }}</field>
+        <field name="arch" type="xml">
+            <search string="{{ title }}">
+{% for field in model.search_fields %}
+                <field name='{{ field.name }}'/>
+{% endfor %}
+{% set filter_fields = model.filter_fields %}
+{% if filter_fields %}
+                <separator/>
+{% for field in filter_fields %}
+                <filter string="{{ field.name.capitalize() }}" name="{{ field.name }}" domain="[('{{ field.name }}', '=', True)]"/>
+{% endfor %}
+{% endif %}
+{% set group_by_fields = model.group_by_fields %}
+{% if group_by_fields %}
+                <group expand="0" string="Group By">
+{% for field in group_by_fields %}
+                    <filter string="{{ field.name.capitalize() }}" name="group_by_{{ field.name }}" context="{'group_by': '{{ field.name }}'}"/>
+{% endfor %}
+                </group>
+{% endif %}
+            </search>
+        </field>
+    </record>
+
+    <record id="{{ view_id }}_action" model="ir.actions.act_window">
+        <field name="name">{{ title }}</field>
+        <field name="res_model">{{ model.name }}</field>
+        <field name="view_mode">{{ list_tag }},form</field>
+        <field name="search_view_id" ref="{{ view_id }}_view_search"/>
+    </record>
+</odoo>
+"""
+
+MENUS_TEMPLATE = """\
+<?xml version="1.0" encoding="UTF-8"?>
+<odoo>
+    <menuitem id="{{ module_name }}_menu_root" name="{{ module_name.replace('_', ' ').title() }}"/>
+{% for model_name in model_names %}
+    <menuitem id="{{ module_name }}_menu_{{ model_name.replace('.', '_') }}" name="{{ model_name.replace('.', ' ').capitalize() }}"
+              parent="{{ module_name }}_menu_root" action="{{ model_name.replace('.', '') }}_action"/>
+{% endfor %}
+</odoo>
+"""
+
+SECURITY_TEMPLATE = """\
+id,name,model_id:id,group_id:id,perm_read,perm_write,perm_create,perm_unlink
+{% for model_name in model_names %}
+{% set sanitized = model_name.replace('.', '_') %}
+access_{{ module_name }}_{{ sanitized }},{{ sanitized }},{{ module_name }}.model_{{ sanitized }},base.group_user,1,1,1,1
+{% endfor %}
+"""
+
+DEFAULT_TEMPLATES = {
+    'module_init.py': MODULE_INIT_TEMPLATE,
+    'models_init.py': MODELS_INIT_TEMPLATE,
+    'manifest.py': MANIFEST_TEMPLATE,
+    'model.py': MODEL_TEMPLATE,
+    'view.xml': VIEW_TEMPLATE,
+    'security.csv': SECURITY_TEMPLATE,
+    'menus.xml': MENUS_TEMPLATE,
+}
+
+
+class TemplateError(Exception):
+    pass
+
+
+class Template:
+    """A template compiled once into a Python function.
+
+    ``{{ expr }}`` inserts ``str(expr)``; ``{% for %}``, ``{% if %}``,
+    ``{% elif %}``, ``{% else %}``, ``{% set name = expr %}`` and the matching
+    ``{% endfor %}``/``{% endif %}`` are control statements. A statement alone
+    on its line consumes the whole line. Expressions are plain Python and are
+    evaluated against the keyword arguments given to ``render``.
+
+    ``render`` appends to one list and joins it once, so rendering stays
+    linear in the size of the output. ``stream`` runs the same code as a
+    generator and yields chunks of about ``CHUNK_SIZE`` characters, so the
+    whole file never has to be held in memory.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+    # Bump whenever compile_code() output changes so cached code is ignored.
+    COMPILER_VERSION = '2'
+    # Compiled code kept in a cache directory; the least recently written
+    # entries go first, so edited override templates do not pile up.
+    DISK_CACHE_ENTRIES = 64
+
+    def __init__(self, source, name='<template>', cache_dir=None):
+        self.source = source
+        self.name = name
+        if cache_dir is None:
+            code = self.compile_code(source, name)
+        else:
+            code = self._cached_code(cache_dir)
+        self.function, self.generator = self._define(code)
+
+    def render(self, **context):
+        return ''.join(self.function(context))
+
+    def stream(self, **context):
+        buffer = []
+        size = 0
+        for piece in self.generator(context):
+            buffer.append(piece)
+            size += len(piece)
+            if size >= self.CHUNK_SIZE:
+                yield ''.join(buffer)
+                buffer = []
+                size = 0
+        if buffer:
+            yield ''.join(buffer)
+
+    def _cached_code(self, cache_dir):
+        """Load the compiled code from ``cache_dir``, compiling and storing it on a miss.
+
+        Entries are keyed by the source, the name (which tracebacks show),
+        ``COMPILER_VERSION`` and the interpreter's bytecode tag; a cache that
+        cannot be read or written is just skipped.
+        """
+        import hashlib
+        import marshal
+
+        key = '\0'.join([self.COMPILER_VERSION, sys.implementation.cache_tag or '', self.name, self.source])
+        path = os.path.join(cache_dir, hashlib.sha256(key.encode('utf-8')).hexdigest()[:32] + '.bin')
+        try:
+            with open(path, 'rb') as f:
+                code = marshal.load(f)
+            if isinstance(code, type(self._cached_code.__code__)):
+                return code
+        except (OSError, EOFError, ValueError, TypeError):
+            pass
+        code = self.compile_code(self.source, self.name)
+        temporary = f'{path}.{os.getpid()}.tmp'
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(temporary, 'wb') as f:
+                marshal.dump(code, f)
+            os.replace(temporary, path)
+            self._evict(cache_dir)
+        except OSError:
+            if os.path.exists(temporary):
+                os.unlink(temporary)
+        return code
+
+    @classmethod
+    def _evict(cls, cache_dir):
+        entries = []
+        for entry in os.scandir(cache_dir):
+            if entry.name.endswith('.bin'):
+                try:
+                    entries.append((entry.stat().st_mtime_ns, entry.path))
+                except FileNotFoundError:
+                    continue
+        entries.sort(reverse=True)
+        for _mtime, path in entries[cls.DISK_CACHE_ENTRIES:]:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+    @staticmethod
+    def compile(source, name='<template>'):
+        """Compile ``source`` into its ``(render, stream)`` functions."""
+        return Template._define(Template.compile_code(source, name))
+
+    @staticmethod
+    def _define(code):
+        namespace = {'_builtins': builtins}
+        exec(code, namespace)
+        return namespace['_render'], namespace['_stream']
+
+    @staticmethod
+    def compile_code(source, name='<template>'):
+        """Compile ``source`` into a code object defining ``_render`` and ``_stream``."""
+        import ast
+        import re
+
+        # A statement alone on its line swallows the indentation and newline.
+        source = re.sub(r'^[ \t]*(\{%.*?%\})[ \t]*\n', r'\1', source, flags=re.MULTILINE)
+        lines = []
+        depth = 1
+        stack = []
+        names = _TemplateNames()
+
+        def emit(line, output=False):
+            lines.append(('    ' * depth, line, output))
+
+        def close_block():
+            if lines[-1][1].endswith(':'):
+                emit('pass')
+
+        def expression(code, mode='eval'):
+            try:
+                tree = ast.parse(code, mode=mode)
+            except SyntaxError as e:
+                raise TemplateError(f"{name}: invalid expression {code!r}: {e.msg}") from None
+            names.visit(tree)
+            return code
+
+        # Runs of text and {{ }} between two statements become one f-string;
+        # expressions are bound to locals first so they may contain quotes.
+        text = []
+        values = []
+
+        def flush():
+            for index, value in enumerate(values):
+                emit(f'_v{index} = {value}')
+            if text:
+                emit(f"f{''.join(text)!r}", output=True)
+            text.clear()
+            values.clear()
+
+        for token in re.split(r'(\{\{.*?\}\}|\{%.*?%\})', source, flags=re.DOTALL):
+            if not token:
+                continue
+            if token.startswith('{{'):
+                text.append(f'{{_v{len(values)}}}')
+                values.append(expression(token[2:-2].strip()))
+                continue
+            if not token.startswith('{%'):
+                text.append(token.replace('{', '{{').replace('}', '}}'))
+                continue
+            flush()
+            statement = token[2:-2].strip()
+            keyword = statement.split(None, 1)[0] if statement else ''
+            if keyword in ('for', 'if'):
+                expression(f'{statement}:\n pass', mode='exec')
+                emit(f'{statement}:')
+                stack.append(keyword)
+                depth += 1
+            elif keyword in ('elif', 'else'):
+                if not stack or stack[-1] != 'if':
+                    raise TemplateError(f"{name}: unexpected {{% {statement} %}}")
+                expression(f'if 0:\n pass\n{statement}:\n pass', mode='exec')
+                close_block()
+                depth -= 1
+                emit(f'{statement}:')
+                depth += 1
+            elif keyword in ('endfor', 'endif'):
+                if not stack or stack.pop() != keyword[3:]:
+                    raise TemplateError(f"{name}: unexpected {{% {statement} %}}")
+                close_block()
+                depth -= 1
+            elif keyword == 'set':
+                emit(expression(statement[3:].strip(), mode='exec'))
+            else:
+                raise TemplateError(f"{name}: unknown statement {{% {statement} %}}")
+        flush()
+        if stack:
+            raise TemplateError(f"{name}: missing {{% end{stack[-1]} %}}")
+
+        # Free names are bound from the render context once, up front; names
+        # the template never supplies fall back to builtins. A name the
+        # template also assigns is read from the context only when given, so
+        # it can be used before its {% set %} or {% for %}.
+        bindings = []
+        for variable in sorted(names.loads):
+            if hasattr(builtins, variable):
+                bindings.append(f'    {variable} = _context.get({variable!r}, _builtins.{variable})')
+            elif variable in names.stores:
+                bindings.append(f'    if {variable!r} in _context: {variable} = _context[{variable!r}]')
+            else:
+                bindings.append(f'    {variable} = _context[{variable!r}]')
+        render = ['def _render(_context):', '    _out = []', '    _append = _out.append'] + bindings
+        render += [f'{indent}_append({line})' if output else indent + line for indent, line, output in lines]
+        render.append('    return _out')
+        stream = ['def _stream(_context):'] + bindings
+        stream += [f'{indent}yield {line}' if output else indent + line for indent, line, output in lines]
+        # A template without output must still compile to a generator.
+        stream += ['    return', '    yield']
+        return compile('\n'.join(render + [''] + stream), name, 'exec')
+
+
+class _TemplateNames:
+    """Collects the names a template reads and assigns at its own scope.
+
+    Names bound inside a lambda or a comprehension belong to that scope
+    and are not looked up in the render context.
+    """
+
+    def __init__(self):
+        self.loads = set()
+        self.stores = set()
+        self._scopes = []
+
+    def visit(self, node):
+        import ast
+
+        if isinstance(node, ast.Name):
+            if not any(node.id in scope for scope in self._scopes):
+                (self.stores if isinstance(node.ctx, ast.Store) else self.loads).add(node.id)
+        elif isinstance(node, ast.Lambda):
+            arguments = node.args
+            for default in arguments.defaults + arguments.kw_defaults:
+                if default is not None:
+                    self.visit(default)
+            parameters = arguments.posonlyargs + arguments.args + arguments.kwonlyargs
+            parameters += [argument for argument in (arguments.vararg, arguments.kwarg) if argument is not None]
+            self._scoped({parameter.arg for parameter in parameters}, [node.body])
+        elif isinstance(node, (ast.ListComp, ast.SetComp, ast.GeneratorExp, ast.DictComp)):
+            # The first iterable is evaluated outside the comprehension.
+            first = node.generators[0]
+            self.visit(first.iter)
+            targets = {
+                name.id for generator in node.generators for name in ast.walk(generator.target)
+                if isinstance(name, ast.Name)
+            }
+            inner = [generator.iter for generator in node.generators[1:]]
+            inner += [condition for generator in node.generators for condition in generator.ifs]
+            inner += [node.key, node.value] if isinstance(node, ast.DictComp) else [node.elt]
+            self._scoped(targets, inner)
+        else:
+            for child in ast.iter_child_nodes(node):
+                self.visit(child)
+
+    def _scoped(self, names, nodes):
+        self._scopes.append(names)
+        for node in nodes:
+            self.visit(node)
+        self._scopes.pop()
+
+
+class TemplateLoader:
+    """Compiles the builder templates, preferring files in ``template_dir``.
+
+    Built-in templates are compiled on first use and kept for the life of the
+    loader. An override file is recompiled when its modification time
+    changes; ``refresh`` checks them, and generators call it once per build.
+    With ``cache_dir``, compiled code is also kept there for the next
+    process; the CLI, which starts a process per command, uses
+    ``default_template_cache_dir()``.
+    """
+
+    def __init__(self, template_dir=None, cache_dir=None):
+        self.template_dir = template_dir
+        self.cache_dir = cache_dir
+        # name -> (override path and mtime or None for the built-in, Template, version)
+        self._compiled = {}
+
+    def get(self, name):
+        return self._entry(name)[1]
+
+    def render(self, name, **context):
+        return self.get(name).render(**context)
+
+    def stream(self, name, **context):
+        return self.get(name).stream(**context)
+
+    def version(self, name):
+        """Identify the template for render-cache keys; overrides hash their source."""
+        return self._entry(name)[2]
+
+    def refresh(self):
+        for name, (origin, _template, _version) in list(self._compiled.items()):
+            if origin != self._override(name):
+                self._compiled.pop(name, None)
+
+    def _override(self, name):
+        if self.template_dir is None:
+            return None
+        path = os.path.join(self.template_dir, name)
+        try:
+            return (path, os.stat(path).st_mtime_ns)
+        except FileNotFoundError:
+            return None
+
+    def _entry(self, name):
+        entry = self._compiled.get(name)
+        if entry is None:
+            entry = self._load(name)
+        return entry
+
+    def _load(self, name):
+        import hashlib
+
+        origin = self._override(name)
+        if origin is not None:
+            with open(origin[0], encoding='utf-8') as f:
+                source = f.read()
+            version = hashlib.sha256(source.encode('utf-8')).hexdigest()[:16]
+        elif name in DEFAULT_TEMPLATES:
+            source = DEFAULT_TEMPLATES[name]
+            version = 'builtin'
+        else:
+            raise TemplateError(f"Unknown template: {name}")
+        entry = (origin, Template(source, origin[0] if origin else name, self.cache_dir), version)
+        self._compiled[name] = entry
+        return entry
+
+
+def default_cache_dir():
+    """The generator's cache directory: ``ODOO_GENERATOR_CACHE_DIR`` or ``~/.cache/odoo_generator``."""
+    if os.environ.get('ODOO_GENERATOR_CACHE_DIR'):
+        return os.environ['ODOO_GENERATOR_CACHE_DIR']
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'odoo_generator')
+
+
+def default_template_cache_dir():
+    return os.path.join(default_cache_dir(), 'templates')
+
+
+_default_loader = None
+
+
+def default_loader():
+    """The process-wide loader, honouring ``ODOO_GENERATOR_TEMPLATE_DIR``."""
+    global _default_loader
+    if _default_loader is None:
+        _default_loader = TemplateLoader(os.environ.get('ODOO_GENERATOR_TEMPLATE_DIR') or None)
+    return _default_loader
@@ -1,7 +1,11 @@
+import os
+import tempfile
+import time
 import unittest
 from unittest.mock import patch
 import tkinter as tk
 from app import ModuleGeneratorApp
+from odoo_generator import FieldSpec, ModelSpec
 
 class TestModuleGeneratorApp(unittest.TestCase):
 
@@ -72,10 +76,10 @@ class TestModuleGeneratorApp(unittest.TestCase):
         add_model_window.winfo_children()[0].winfo_children()[5].invoke()  # Click "Save Model" button
 
         self.assertEqual(len(self.app.models), 1)
-        self.assertEqual(self.app.models[0]['name'], 'test_model')
-        self.assertEqual(len(self.app.models[0]['fields']), 1)
-        self.assertEqual(self.app.models[0]['fields'][0]['name'], 'field_name')
-        self.assertEqual(self.app.models[0]['fields'][0]['type'], 'Char')
+        self.assertEqual(self.app.models[0].name, 'test_model')
+        self.assertEqual(len(self.app.models[0].fields), 1)
+        self.assertEqual(self.app.models[0].fields[0].name, 'field_name')
+        self.assertEqual(self.app.models[0].fields[0].type, 'Char')
 
     def test_generate_module(self):
         # Simulate the complete workflow to generate a module
@@ -84,10 +88,60 @@ class TestModuleGeneratorApp(unittest.TestCase):
         self.app.model_info_screen.children['!button2'].invoke()  # Click "Next" button to review screen
 
         # Click "Confirm" button on the review screen
-        self.app.review_screen.children['!button'].invoke()
+        self.app.review_screen.confirm_button.invoke()
+        self.wait_for_generation()
         result_screen = self.app.result_screen
 
         self.assertIn("Module", result_screen.message_label.cget("text"))
 
+    def test_review_tree_updates_incrementally(self):
+        # Models are shown as tree parents with their fields as children
+        self.app.models = [ModelSpec('model_a', [FieldSpec('name', 'Char')]), ModelSpec('model_b')]
+        self.app.show_review()
+        tree = self.app.review_screen.models_tree
+        model_a, model_b = tree.get_children()
+        self.assertEqual(tree.item(model_a, 'text'), 'model_a')
+        field = tree.get_children(model_a)[0]
+        self.assertEqual((tree.item(field, 'text'), tree.set(field, 'type')), ('name', 'Char'))
+
+        # Only the changed model is re-inserted; removed models disappear
+        self.app.models[0].add_field('note', 'Text')
+        self.app.show_review()
+        new_model_a, same_model_b = tree.get_children()
+        self.assertNotEqual(new_model_a, model_a)
+        self.assertEqual(same_model_b, model_b)
+        self.assertEqual(len(tree.get_children(new_model_a)), 2)
+
+        self.app.models.pop()
+        self.app.show_review()
+        self.assertEqual(tree.get_children(), (new_model_a,))
+
+    def test_cancel_generation(self):
+        # Cancelling stops the worker thread between files and reports it on the result screen
+        self.app.module_info = {'name': 'cancelled_module', 'version': '', 'category': '', 'summary': '', 'dependencies': ''}
+        self.app.models = [ModelSpec(f'model_{i}') for i in range(50)]
+        self.app.show_review()
+
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmp, \
+             patch('odoo_generator.ModelBuilder.build_model_file', side_effect=lambda *args: time.sleep(0.01)):
+            os.chdir(tmp)
+            try:
+                self.app.review_screen.confirm_button.invoke()
+                self.app.review_screen.cancel_button.invoke()
+                self.wait_for_generation()
+            finally:
+                os.chdir(cwd)
+
+        self.assertIsNone(self.app.generation_thread)
+        self.assertIn("cancelled", self.app.result_screen.message_label.cget("text"))
+
+    def wait_for_generation(self, timeout=10):
+        # Let the Tk loop poll the worker thread until generation has finished
+        deadline = time.time() + timeout
+        while self.app.generation_thread is not None and time.time() < deadline:
+            self.app.update()
+            time.sleep(0.01)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,135 @@
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+import zipfile
+
+from cli import main
+
+SPEC = {'name': 'test_module', 'models': [{'name': 'test_model', 'fields': {'field1': 'Char'}}]}
+
+
+class TestCli(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+        with open('spec.json', 'w') as f:
+            json.dump(SPEC, f)
+        # The CLI keeps compiled templates in the cache directory.
+        self.cache_dir = os.environ.get('ODOO_GENERATOR_CACHE_DIR')
+        os.environ['ODOO_GENERATOR_CACHE_DIR'] = os.path.join(self.tmp.name, 'cache')
+
+    def tearDown(self):
+        if self.cache_dir is None:
+            del os.environ['ODOO_GENERATOR_CACHE_DIR']
+        else:
+            os.environ['ODOO_GENERATOR_CACHE_DIR'] = self.cache_dir
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def run_cli(self, *argv):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            status = main(list(argv))
+        return status, stdout.getvalue()
+
+    def test_generate_and_verify(self):
+        self.assertEqual(self.run_cli('verify', 'spec.json')[0], 1)
+        self.assertEqual(self.run_cli('generate', 'spec.json')[0], 0)
+        status, output = self.run_cli('verify', 'spec.json')
+        self.assertEqual(status, 0)
+        self.assertIn("7/7 files up to date", output)
+        self.assertTrue(os.listdir(os.path.join('cache', 'templates')))
+
+    def test_invalid_spec_is_reported(self):
+        spec = {'name': 'test_module', 'models': [{'name': 'test_model', 'fields': {
+            'count': {'type': 'Integer', 'compute': {
+                'depends': ['create_uid'], 'aggregate': 'count', 'comodel': 'res.users', 'inverse': 'x_id',
+            }}
+        }}]}
+        with open('invalid.json', 'w') as f:
+            json.dump(spec, f)
+
+        with self.assertRaises(SystemExit) as raised:
+            self.run_cli('generate', 'invalid.json')
+
+        self.assertIn(
+            "invalid.json: Model test_model: field count aggregates create_uid", str(raised.exception.code)
+        )
+
+    def test_stream_json_lines(self):
+        with open('models.jsonl', 'w') as f:
+            f.write(json.dumps(SPEC['models'][0]) + '\n\n')
+
+        status, output = self.run_cli('stream', 'test_module', 'models.jsonl')
+
+        self.assertEqual(status, 0)
+        self.assertIn("1 models, 7 files written", output)
+        self.assertEqual(self.run_cli('verify', 'spec.json')[0], 0)
+
+    def test_stream_invalid_module(self):
+        with open('models.jsonl', 'w') as f:
+            f.write(json.dumps(SPEC['models'][0]) + '\n')
+
+        for argv, error in (
+            (['bad-name'], "bad-name: Module name 'bad-name' is not a valid Python identifier"),
+            (['test_module', '--odoo-version', '16'], "test_module: Unsupported Odoo version: 16"),
+        ):
+            stderr = io.StringIO()
+            with contextlib.redirect_stderr(stderr):
+                self.assertEqual(main(['stream', argv[0], 'models.jsonl'] + argv[1:]), 1)
+            self.assertIn(error, stderr.getvalue())
+        self.assertFalse(os.path.exists('test_module'))
+
+    def test_generate_archive(self):
+        self.assertEqual(self.run_cli('generate', 'spec.json', '--archive', 'out.zip')[0], 0)
+        self.assertFalse(os.path.exists('test_module'))
+        with zipfile.ZipFile('out.zip') as archive:
+            self.assertIn('test_module/__manifest__.py', archive.namelist())
+
+    def test_generate_trace_and_profile(self):
+        status, output = self.run_cli('generate', 'spec.json', '--trace', 'trace.jsonl', '--profile', '3')
+        self.assertEqual(status, 0)
+        self.assertIn("Slowest 3 builder calls:", output)
+        with open('trace.jsonl') as f:
+            events = [json.loads(line) for line in f]
+        self.assertEqual(sum(event['event'] == 'file_written' for event in events), 7)
+
+    def test_diff_does_not_write(self):
+        self.run_cli('generate', 'spec.json')
+        SPEC['models'][0]['fields']['field2'] = 'Text'
+        try:
+            with open('spec.json', 'w') as f:
+                json.dump(SPEC, f)
+            status, output = self.run_cli('diff', 'spec.json')
+        finally:
+            del SPEC['models'][0]['fields']['field2']
+        self.assertEqual(status, 1)
+        self.assertIn("+    field2 = fields.Text(string='Field2')", output)
+        with open(os.path.join('test_module', 'models', 'test_model.py')) as f:
+            self.assertNotIn('field2', f.read())
+
+        status, output = self.run_cli('diff', 'spec.json', '--json')
+        self.assertEqual(status, 1)
+        self.assertEqual(json.loads(output), [{
+            'module': 'test_module',
+            'added': [],
+            'modified': [os.path.join('test_module', 'models', 'test_model.py'),
+                         os.path.join('test_module', 'views', 'test_model_views.xml')],
+            'unchanged': 5,
+        }])
+
+    def test_does_not_import_tkinter(self):
+        code = "import sys, cli; print('tkinter' in sys.modules)"
+        output = subprocess.check_output([sys.executable, '-c', code], cwd=self.cwd, text=True)
+        self.assertEqual(output.strip(), 'False')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,681 @@
+import ast
+import io
+import json
+import os
+import sys
+import tarfile
+import tempfile
+import time
+import unittest
+import zipfile
+from xml.etree import ElementTree
+
+from odoo_generator import (
+    BatchGenerator, ComputeSpec, FieldSpec, FileManager, IndexSpec, Instrumentation, JsonLinesSink, ModelBuilder, ModelSpec,
+    ModuleDiff, ModuleSpec, OdooModuleGenerator, RenderCache, TimingSummary, TreeWriter, exchange_paths,
+    load_module_specs
+)
+from templates import Template
+
+
+def put_and_commit(cache_dir, key):
+    """Write to a render cache from another process; returns how long it took."""
+    start = time.perf_counter()
+    cache = RenderCache(cache_dir)
+    cache.put(key, 'content')
+    cache.close()
+    return time.perf_counter() - start
+
+
+class TestOdooModuleGenerator(unittest.TestCase):
+
+    def setUp(self):
+        # Generate everything inside a scratch directory
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def test_generate_module(self):
+        generator = OdooModuleGenerator('test_module')
+        generator.spec.add_model('test_model', [FieldSpec('field1', 'Char'), FieldSpec('field2', 'Text')])
+
+        message = generator.generate_module()
+
+        self.assertIn("created successfully", message)
+        for path in ['__init__.py', '__manifest__.py', 'models/__init__.py', 'models/test_model.py',
+                     'views/test_model_views.xml', 'security/ir.model.access.csv']:
+            self.assertTrue(os.path.isfile(os.path.join('test_module', path)), path)
+
+    def test_regeneration_skips_unchanged_files(self):
+        generator = OdooModuleGenerator('test_module')
+        model = generator.spec.add_model('test_model', [FieldSpec('field1', 'Char')])
+        generator.generate_module()
+        model_path = os.path.join('test_module', 'models', 'test_model.py')
+        mtime = os.stat(model_path).st_mtime_ns
+
+        message = generator.generate_module()
+        self.assertIn("0 files written, 7 unchanged", message)
+        self.assertEqual(os.stat(model_path).st_mtime_ns, mtime)
+
+        model.add_field('field2', 'Text')
+        message = generator.generate_module()
+        self.assertIn("2 files written, 5 unchanged", message)
+
+    def test_tree_writer_counts_syscalls(self):
+        generator = OdooModuleGenerator('test_module')
+        generator.spec.add_model('test_model', [FieldSpec('field1', 'Char')])
+
+        generator.build_module()
+        report = generator.io_report
+        # 4 mkdir, then open/write/fstat/close for each file in a fresh directory
+        self.assertEqual((report.directories_created, report.files, report.written), (4, 7, 7))
+        self.assertEqual(report.syscalls, 4 + 7 * 4)
+        self.assertLess(report.syscalls, report.legacy_syscalls)
+
+        generator.build_module()
+        report = generator.io_report
+        # One mkdir attempt per directory and one stat per unchanged file
+        self.assertEqual((report.directories_created, report.skipped, report.bytes_written), (0, 7, 0))
+        self.assertEqual(report.syscalls, 4 + 7)
+
+    def test_tree_writer_thread_pool(self):
+        os.makedirs('test_module')
+        file_manager = FileManager('test_module')
+        files = {os.path.join('test_module', 'data', f'{index}.txt'): str(index) for index in range(50)}
+
+        report = TreeWriter(file_manager, jobs=4, batch_size=8).write(files)
+
+        self.assertEqual((report.directories_created, report.written), (1, 50))
+        with open(os.path.join('test_module', 'data', '42.txt')) as f:
+            self.assertEqual(f.read(), '42')
+
+    def test_publish_into_addons_path(self):
+        os.makedirs('addons')
+        generator = OdooModuleGenerator('test_module')
+        model = generator.spec.add_model('test_model', [FieldSpec('field1', 'Char')])
+        self.assertIn("7 files written", generator.generate_module(addons_path='addons'))
+        manifest = os.path.join('addons', 'test_module', '__manifest__.py')
+        model_file = os.path.join('addons', 'test_module', 'models', 'test_model.py')
+        manifest_inode = os.stat(manifest).st_ino
+
+        model.add_field('field2', 'Text')
+        message = generator.generate_module(addons_path='addons')
+
+        self.assertIn("2 files written, 5 unchanged", message)
+        self.assertEqual(sorted(os.listdir('addons')), ['.test_module.lock', 'test_module'])
+        # Unchanged files are hard links to the previous version's inode
+        self.assertEqual(os.stat(manifest).st_ino, manifest_inode)
+        with open(model_file) as f:
+            self.assertIn('field2', f.read())
+
+    def test_publish_keeps_files_it_did_not_generate(self):
+        os.makedirs('addons')
+        generator = OdooModuleGenerator('test_module')
+        generator.spec.add_model('model_a')
+        generator.spec.add_model('model_b')
+        generator.generate_module(addons_path='addons')
+        module = os.path.join('addons', 'test_module')
+        os.makedirs(os.path.join(module, 'static', 'description'))
+        for path in ('static/description/icon.png', 'models/custom.py'):
+            with open(os.path.join(module, *path.split('/')), 'w') as f:
+                f.write(path)
+
+        generator.spec.models.pop()
+        generator.generate_module(addons_path='addons')
+
+        for path in ('static/description/icon.png', 'models/custom.py'):
+            with open(os.path.join(module, *path.split('/'))) as f:
+                self.assertEqual(f.read(), path)
+        # Files of the removed model were generated, so they go
+        self.assertFalse(os.path.exists(os.path.join(module, 'models', 'model_b.py')))
+
+    def test_publish_recovers_from_interrupted_publish(self):
+        os.makedirs('addons')
+        generator = OdooModuleGenerator('test_module')
+        generator.spec.add_model('model_a')
+        generator.generate_module(addons_path='addons')
+        with open(os.path.join('addons', 'test_module', 'notes.txt'), 'w') as f:
+            f.write('kept')
+        # Stopped between the two renames of the fallback swap
+        os.rename(os.path.join('addons', 'test_module'), os.path.join('addons', '.test_module.abc.old'))
+        os.makedirs(os.path.join('addons', '.test_module.abc', 'models'))
+
+        generator.generate_module(addons_path='addons')
+
+        self.assertEqual(sorted(os.listdir('addons')), ['.test_module.lock', 'test_module'])
+        with open(os.path.join('addons', 'test_module', 'notes.txt')) as f:
+            self.assertEqual(f.read(), 'kept')
+
+    def test_exchange_paths(self):
+        for name in ('first', 'second'):
+            os.makedirs(os.path.join(name, name))
+        if not exchange_paths('first', 'second'):
+            self.skipTest("renameat2(RENAME_EXCHANGE) is not available")
+        self.assertEqual(os.listdir('first'), ['second'])
+        self.assertEqual(os.listdir('second'), ['first'])
+
+    def test_diff_against_disk(self):
+        generator = OdooModuleGenerator('test_module')
+        generator.spec.add_model('model_a', [FieldSpec('name', 'Char')])
+        generator.spec.add_model('model_b', [FieldSpec('name', 'Char')])
+        generator.generate_module()
+        self.assertFalse(generator.diff().has_changes)
+
+        model_a = os.path.join('test_module', 'models', 'model_a.py')
+        with open(model_a) as f:
+            content = f.read()
+        with open(model_a, 'w') as f:
+            f.write(content.replace('Char', 'Text'))
+        os.remove(os.path.join('test_module', 'views', 'model_b_views.xml'))
+        threshold = ModuleDiff.MMAP_THRESHOLD
+        ModuleDiff.MMAP_THRESHOLD = 1
+        try:
+            module_diff = generator.diff()
+        finally:
+            ModuleDiff.MMAP_THRESHOLD = threshold
+
+        self.assertEqual(module_diff.summary(), {
+            'module': 'test_module',
+            'added': [os.path.join('test_module', 'views', 'model_b_views.xml')],
+            'modified': [model_a],
+            'unchanged': 7,
+        })
+        diff = ''.join(module_diff.unified())
+        self.assertIn("-    name = fields.Text(string='Name')", diff)
+        self.assertIn("--- /dev/null", diff)
+        self.assertIn('Text', open(model_a).read())
+
+    def test_write_file_rewrites_edited_file(self):
+        os.makedirs('test_module')
+        file_manager = FileManager('test_module')
+        file_manager.load_index()
+        path = os.path.join('test_module', 'data.txt')
+        self.assertTrue(file_manager.write_file(path, 'abc'))
+        with open(path, 'w') as f:
+            f.write('xyz')
+        self.assertTrue(file_manager.write_file(path, 'abc'))
+        self.assertFalse(file_manager.write_file(path, 'abc'))
+        self.assertEqual((file_manager.written, file_manager.skipped), (2, 1))
+
+    def test_remove_file_stays_inside_the_module(self):
+        os.makedirs(os.path.join('test_module', 'models'))
+        with open('outside.py', 'w') as f:
+            f.write('keep')
+        os.symlink(os.path.abspath('outside.py'), os.path.join('test_module', 'models', 'linked.py'))
+        file_manager = FileManager('test_module')
+        for path in ('outside.py', os.path.join('test_module', 'models', '..', '..', 'outside.py'),
+                     os.path.join('test_module', 'models', '..', '..')):
+            with self.assertRaises(ValueError, msg=path):
+                file_manager.remove_file(path)
+        # A symlink inside the module is removed, not the file it points to.
+        self.assertTrue(file_manager.remove_file(os.path.join('test_module', 'models', 'linked.py')))
+        self.assertTrue(os.path.exists('outside.py'))
+        self.assertFalse(file_manager.remove_file(os.path.join('test_module', 'models', 'gone.py')))
+
+    def test_render_cache_reuses_unchanged_models(self):
+        cache = RenderCache(os.path.join(self.tmp.name, 'cache'))
+        generator = OdooModuleGenerator('test_module', render_cache=cache)
+        generator.spec.add_model('model_a', [FieldSpec('name', 'Char')])
+        model_b = generator.spec.add_model('model_b', [FieldSpec('name', 'Char')])
+        generator.generate_module()
+        self.assertEqual((cache.hits, cache.misses), (0, 4))
+
+        model_b.add_field('note', 'Text')
+        generator.generate_module()
+        self.assertEqual((cache.hits, cache.misses), (2, 6))
+        with open(os.path.join('test_module', 'models', 'model_b.py')) as f:
+            self.assertIn("note = fields.Text(string='Note')", f.read())
+        cache.close()
+
+    def test_render_cache_does_not_block_other_processes(self):
+        from concurrent.futures import ProcessPoolExecutor
+
+        cache_dir = os.path.join(self.tmp.name, 'cache')
+        cache = RenderCache(cache_dir)
+        generator = OdooModuleGenerator('test_module', render_cache=cache)
+        generator.spec.add_model('model_a', [FieldSpec('name', 'Char')])
+        generator.render_files()
+        cache.get_or_render('ModelBuilder', generator.spec.models[0], lambda: 'uncommitted', template='other')
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            self.assertLess(executor.submit(put_and_commit, cache_dir, 'other').result(), 1)
+        cache.close()
+        other = RenderCache(cache_dir)
+        self.assertEqual(other.get('other'), 'content')
+        self.assertEqual(other.connection.execute('SELECT COUNT(*) FROM renders').fetchone()[0], 4)
+        other.close()
+
+    def test_render_cache_evicts_least_recently_used(self):
+        cache = RenderCache(os.path.join(self.tmp.name, 'cache'), max_bytes=10)
+        cache.put('old', 'x' * 6)
+        cache.commit()
+        cache.put('new', 'y' * 6)
+        cache.commit()
+        self.assertIsNone(cache.get('old'))
+        self.assertEqual(cache.get('new'), 'y' * 6)
+        cache.close()
+
+    def test_generate_module_into_zip_stream(self):
+        generator = OdooModuleGenerator('test_module')
+        generator.spec.add_model('test_model', [FieldSpec('field1', 'Char')])
+        stream = io.BytesIO()
+
+        message = generator.generate_module(archive=stream)
+
+        self.assertIn("7 files written", message)
+        self.assertFalse(os.path.exists('test_module'))
+        with zipfile.ZipFile(io.BytesIO(stream.getvalue())) as archive:
+            self.assertIn('test_module/models/test_model.py', archive.namelist())
+            self.assertIn(b'fields.Char', archive.read('test_module/models/test_model.py'))
+
+    def test_generate_module_into_tar_file(self):
+        generator = OdooModuleGenerator('test_module')
+        generator.spec.add_model('test_model')
+
+        generator.generate_module(archive='test_module.tar.gz')
+
+        self.assertFalse(os.path.exists('test_module'))
+        with tarfile.open('test_module.tar.gz') as archive:
+            self.assertIn('test_module/__manifest__.py', archive.getnames())
+
+    def test_stream_files(self):
+        generator = OdooModuleGenerator('test_module')
+        model = generator.spec.add_model('test_model')
+        for index in range(200):
+            model.add_field(f'field{index}', 'Char')
+        chunk_size = Template.CHUNK_SIZE
+        Template.CHUNK_SIZE = 1024
+        try:
+            pairs = list(generator.stream_files())
+            streamed = {}
+            for path, chunk in pairs:
+                self.assertLessEqual(len(chunk), 2 * 1024)
+                streamed.setdefault(os.path.join('test_module', *path.split('/')), []).append(chunk)
+
+            self.assertGreater(len(streamed[os.path.join('test_module', 'models', 'test_model.py')]), 1)
+            self.assertEqual({path: ''.join(chunks) for path, chunks in streamed.items()}, generator.render_files())
+            self.assertEqual(generator.files_done, 7)
+
+            file_manager = generator.write_stream(FileManager('test_module'))
+            self.assertEqual(file_manager.written, 7)
+            file_manager = generator.write_stream(FileManager('test_module'))
+            self.assertEqual((file_manager.written, file_manager.skipped), (0, 7))
+        finally:
+            Template.CHUNK_SIZE = chunk_size
+        self.assertEqual(sorted(os.listdir(os.path.join('test_module', 'models'))), ['__init__.py', 'test_model.py'])
+
+    def test_render_pool_matches_serial_output(self):
+        spec = ModuleSpec('test_module')
+        for index in range(20):
+            spec.add_model(f'model_{index}', [FieldSpec('name', 'Char'), FieldSpec(f'field_{index}', 'Integer')])
+        expected = OdooModuleGenerator.from_spec(spec).render_files()
+
+        for pool in ('thread', 'process'):
+            generator = OdooModuleGenerator.from_spec(spec, render_jobs=3, render_pool=pool)
+            self.assertEqual(list(generator.render_files().items()), list(expected.items()), pool)
+
+        cache = RenderCache(os.path.join(self.tmp.name, 'cache'))
+        generator = OdooModuleGenerator.from_spec(spec, cache, render_jobs=3)
+        self.assertEqual(generator.render_files(), expected)
+        self.assertEqual(generator.render_files(), expected)
+        self.assertEqual((cache.hits, cache.misses), (40, 40))
+        cache.close()
+
+    def test_build_from_lines(self):
+        spec = ModuleSpec('test_module')
+        for index in range(5):
+            spec.add_model(f'model.{index}', [FieldSpec('name', 'Char')])
+        lines = io.StringIO(''.join(json.dumps(model.to_dict()) + '\n' for model in spec.models))
+
+        generator = OdooModuleGenerator('test_module')
+        file_manager = generator.build_from_lines(lines)
+
+        self.assertEqual((generator.models_done, file_manager.written), (5, 15))
+        for path, content in OdooModuleGenerator.from_spec(spec).render_files().items():
+            with open(path) as f:
+                self.assertEqual(f.read(), content, path)
+        self.assertEqual(generator.spec.models, [])
+
+        with self.assertRaisesRegex(ValueError, "Line 2"):
+            generator.build_from_lines(['{"name": "ok"}', '{"fields": {}}'])
+
+    def test_progress_and_cancel(self):
+        events = []
+
+        def progress(files_done, files_total, models_done):
+            events.append((files_done, files_total, models_done))
+            if files_done == 4:
+                generator.cancel()
+
+        generator = OdooModuleGenerator('test_module', progress_callback=progress)
+        generator.spec.add_model('model_a')
+        generator.spec.add_model('model_b')
+
+        message = generator.generate_module()
+
+        self.assertEqual(message, "Generation of module test_module was cancelled.")
+        self.assertEqual(events, [(1, 9, 0), (2, 9, 0), (3, 9, 0), (4, 9, 0)])
+        # Nothing is written until the whole module has been rendered
+        self.assertFalse(os.path.exists('test_module'))
+
+    def test_progress_and_cancel_while_writing(self):
+        events = []
+
+        def progress(files_done, files_total, models_done):
+            events.append((generator.phase, files_done, files_total))
+            if generator.phase == 'writing' and files_done == 3:
+                generator.cancel()
+
+        generator = OdooModuleGenerator('test_module', progress_callback=progress)
+        generator.spec.add_model('model_a')
+        generator.spec.add_model('model_b')
+
+        message = generator.generate_module()
+
+        self.assertEqual(message, "Generation of module test_module was cancelled.")
+        self.assertEqual(events[8:], [('rendering', 9, 9), ('writing', 1, 9), ('writing', 2, 9), ('writing', 3, 9)])
+        written = [name for _root, _dirs, files in os.walk('test_module') for name in files]
+        self.assertEqual(len(written), 3 + 1)  # and the hash index of those three
+
+    def test_instrumentation_events(self):
+        events = []
+        summary = TimingSummary()
+        stream = io.StringIO()
+        instrumentation = Instrumentation(events.append, summary, JsonLinesSink(stream))
+        generator = OdooModuleGenerator('test_module', instrumentation=instrumentation)
+        generator.spec.add_model('test_model', [FieldSpec('field1', 'Char')])
+
+        generator.generate_module()
+
+        kinds = [event['event'] for event in events]
+        self.assertLess(kinds.index('builder_end'), kinds.index('directories_created'))
+        self.assertLess(kinds.index('directories_created'), kinds.index('file_written'))
+        self.assertEqual(kinds.count('builder_start'), 7)
+        self.assertEqual(kinds.count('builder_end'), 7)
+        self.assertEqual(kinds.count('file_written'), 7)
+        model_end = next(event for event in events
+                         if event['event'] == 'builder_end' and event['builder'] == 'ModelBuilder')
+        self.assertEqual((model_end['method'], model_end['model']), ('build_model_file', 'test_model'))
+        written = [event for event in events if event['event'] == 'file_written']
+        self.assertTrue(all(event['written'] and event['bytes'] > 0 for event in written))
+        self.assertEqual(len(stream.getvalue().splitlines()), len(events))
+        report = summary.report(top=6)
+        self.assertIn("ModelBuilder.build_model_file x1", report)
+        self.assertIn("Slowest 6 file writes:", report)
+
+    def test_from_spec(self):
+        generator = OdooModuleGenerator.from_spec(
+            {'name': 'test_module', 'models': [{'name': 'test.model', 'fields': {'field1': 'Char'}}]}
+        )
+        self.assertEqual(generator.model_names, ['test.model'])
+        self.assertEqual(generator.spec.models[0].fields, [FieldSpec('field1', 'Char')])
+
+    def test_spec_round_trip(self):
+        data = {'name': 'test_module', 'models': [{'name': 'test.model', 'fields': {'field1': 'Char'}}]}
+        spec = ModuleSpec.from_dict(data)
+        self.assertEqual(spec.to_dict(), data)
+        self.assertEqual(ModelSpec.from_dict({'name': 'm', 'fields': [{'name': 'f', 'type': 'Char'}]}).fields,
+                         [FieldSpec('f', 'Char')])
+        for name in ('../x', 'a/b', '', 'class', None):
+            with self.assertRaises(ValueError, msg=name):
+                ModuleSpec.from_dict({'name': name})
+        for name in ('../../x', 'a/b', 'sale..order', 'Sale.Order', '.x', '', None):
+            with self.assertRaises(ValueError, msg=name):
+                ModelSpec(name)
+
+    def test_field_indexes(self):
+        model = ModelSpec.from_dict({'name': 'test.model', 'fields': {
+            'name': {'type': 'Char', 'search': True},
+            'code': {'type': 'Char', 'index': True},
+            'partner_id': 'Many2one',
+            'parent_id': {'type': 'Many2one', 'index': 'btree_not_null'},
+            'company_id': {'type': 'Many2one', 'index': False},
+            'amount': {'type': 'Float', 'search': True},
+            'note': 'Text',
+        }})
+        self.assertEqual(ModelSpec.from_dict(model.to_dict()), model)
+
+        content = ModelBuilder('test_module', model).render_model_file()
+        self.assertIn("name = fields.Char(string='Name', index='trigram')", content)
+        self.assertIn("code = fields.Char(string='Code', index=True)", content)
+        self.assertIn("partner_id = fields.Many2one(string='Partner_id', index=True)", content)
+        self.assertIn("parent_id = fields.Many2one(string='Parent_id', index='btree_not_null')", content)
+        self.assertIn("company_id = fields.Many2one(string='Company_id')", content)
+        self.assertIn("amount = fields.Float(string='Amount', index=True)", content)
+        self.assertIn("note = fields.Text(string='Note')", content)
+
+        with self.assertRaises(ValueError):
+            FieldSpec('amount', 'Float', index='trigram')
+        with self.assertRaises(ValueError):
+            FieldSpec('name', 'Char', index='hash')
+
+    def test_batch_overrides(self):
+        data = {'name': 'test.model', 'fields': {'name': 'Char'}, 'batch_overrides': True}
+        model = ModelSpec.from_dict(data)
+        self.assertEqual(model.to_dict(), data)
+
+        content = ModelBuilder('test_module', model).render_model_file()
+        tree = ast.parse(content)
+        self.assertIn("from odoo import api, fields, models", content)
+        self.assertIn("    @api.model_create_multi\n    def create(self, vals_list):", content)
+        self.assertIn("    def write(self, vals):", content)
+        self.assertFalse([node for node in ast.walk(tree) if isinstance(node, (ast.For, ast.comprehension))])
+
+        plain = ModelBuilder('test_module', ModelSpec.from_dict({'name': 'test.model', 'fields': {'name': 'Char'}}))
+        self.assertNotIn("api", plain.render_model_file())
+
+    def test_model_indexes(self):
+        data = {
+            'name': 'sale.thing',
+            'fields': {'company_id': 'Many2one', 'state': 'Char', 'active': 'Boolean'},
+            'indexes': [
+                {'fields': ['company_id', 'state'], 'where': 'active'},
+                {'fields': ['state'], 'method': 'hash', 'name': 'sale_thing_state_hash'},
+                {'fields': ['create_date']},
+            ],
+        }
+        model = ModelSpec.from_dict(data)
+        self.assertEqual(model.to_dict(), data)
+
+        content = ModelBuilder('test_module', model).render_model_file()
+        ast.parse(content)
+        self.assertIn("from odoo.tools.sql import create_index", content)
+        self.assertIn("    def init(self):\n        super().init()\n", content)
+        self.assertIn(
+            "create_index(self.env.cr, 'sale_thing_company_id_state_index', self._table, ['company_id', 'state'], "
+            "where='active')", content
+        )
+        self.assertIn("create_index(self.env.cr, 'sale_thing_state_hash', self._table, ['state'], method='hash')",
+                      content)
+        self.assertEqual(len(IndexSpec(['column_' + 'x' * 60]).index_name('test.model')), 63)
+
+        with self.assertRaises(ValueError):
+            ModelSpec.from_dict(dict(data, indexes=[['missing_id']]))
+        fields = dict(data['fields'], line_ids='One2many', tag_ids='Many2many', image='Image')
+        for column in ('line_ids', 'tag_ids', 'image'):
+            with self.assertRaisesRegex(ValueError, f"{column} is not a column", msg=column):
+                ModelSpec.from_dict(dict(data, fields=fields, indexes=[['state', column]]))
+        with self.assertRaises(ValueError):
+            IndexSpec(['company_id; DROP TABLE x'])
+        with self.assertRaises(ValueError):
+            IndexSpec(['company_id', 'state'], method='hash')
+        for name in ('bad"name', 'x' * 64, 'índice', ''):
+            with self.assertRaises(ValueError, msg=name):
+                IndexSpec(['state'], name=name)
+
+    def test_list_and_search_views(self):
+        generator = OdooModuleGenerator.from_spec({'name': 'test_module', 'models': [{
+            'name': 'sale.thing',
+            'fields': {
+                'name': {'type': 'Char', 'search': True},
+                'code': {'type': 'Char', 'search': True, 'index': False},
+                'partner_id': 'Many2one',
+                'active': {'type': 'Boolean', 'index': True},
+                'state': 'Selection',
+                'note': 'Text',
+            },
+            'list_view': {'limit': 200, 'columns': ['name', 'partner_id', 'note'], 'tag': 'tree'},
+        }]})
+        files = generator.render_files()
+        view = ElementTree.fromstring(files[os.path.join('test_module', 'views', 'sale.thing_views.xml')])
+        arches = {
+            record.get('id'): record.find("field[@name='arch']")[0] for record in view.iter('record')
+            if record.get('model') == 'ir.ui.view'
+        }
+
+        tree = arches['salething_view_list']
+        self.assertEqual((tree.tag, tree.get('limit')), ('tree', '200'))
+        self.assertEqual([(field.get('name'), field.get('optional')) for field in tree],
+                         [('name', None), ('partner_id', None), ('note', 'hide')])
+
+        search = arches['salething_view_search']
+        self.assertEqual([field.get('name') for field in search.iter('field')], ['name'])
+        self.assertEqual([item.get('name') for item in search.iter('filter')], ['active', 'group_by_partner_id'])
+
+        action = view.find("record[@model='ir.actions.act_window']")
+        self.assertEqual(action.find("field[@name='view_mode']").text, 'tree,form')
+        menus = ElementTree.fromstring(files[os.path.join('test_module', 'views', 'menus.xml')])
+        self.assertEqual([(menu.get('parent'), menu.get('action')) for menu in menus],
+                         [(None, None), ('test_module_menu_root', 'salething_action')])
+
+        default_list = ModelSpec.from_dict({'name': 'm', 'fields': {'a': 'Char', 'b': 'Html'}})
+        self.assertEqual([field.name for field in default_list.list_fields], ['a'])
+
+        # Without a tag, the module's Odoo version picks the list element
+        view_path = os.path.join('test_module', 'views', 'm_views.xml')
+        for odoo_version, tag in ((17, 'tree'), (18, 'list')):
+            spec = ModuleSpec('test_module', [default_list], odoo_version=odoo_version)
+            self.assertEqual(ModuleSpec.from_dict(spec.to_dict()), spec)
+            content = OdooModuleGenerator.from_spec(spec).render_files()[view_path]
+            self.assertIn(f'<field name="view_mode">{tag},form</field>', content)
+            self.assertIn(f'<{tag} string="M" limit="80">', content)
+        with self.assertRaises(ValueError):
+            ModuleSpec('test_module', odoo_version=16)
+        with self.assertRaises(ValueError):
+            ModelSpec.from_dict({'name': 'm', 'fields': {'a': 'Char'}, 'list_view': {'columns': ['b']}})
+
+    def test_computed_fields(self):
+        data = {'name': 'sale.thing', 'fields': {
+            'line_ids': 'One2many',
+            'partner_id': 'Many2one',
+            'amount_total': {'type': 'Float', 'compute': {
+                'depends': ['line_ids.amount'], 'store': True,
+                'aggregate': 'sum', 'comodel': 'sale.thing.line', 'inverse': 'order_id',
+            }},
+            'label': {'type': 'Char', 'search': True, 'compute': {'depends': ['partner_id.name']}},
+        }}
+        model = ModelSpec.from_dict(data)
+        self.assertEqual(model.to_dict(), data)
+        self.assertEqual(model.search_fields, [])
+
+        content = ModelBuilder('test_module', model).render_model_file()
+        ast.parse(content)
+        self.assertIn("from odoo import api, fields, models", content)
+        self.assertIn(
+            "amount_total = fields.Float(string='Amount_total', compute='_compute_amount_total', store=True)", content
+        )
+        self.assertIn("label = fields.Char(string='Label', compute='_compute_label')", content)
+        self.assertIn("    @api.depends('line_ids.amount')\n    def _compute_amount_total(self):", content)
+        self.assertIn(
+            "self.env['sale.thing.line']._read_group(\n"
+            "            [('order_id', 'in', self.ids)], ['order_id'], ['amount:sum'],", content
+        )
+        self.assertIn("    @api.depends('partner_id.name')\n    def _compute_label(self):", content)
+
+        with self.assertRaises(ValueError):
+            FieldSpec('label', 'Char', index=True, compute=ComputeSpec(['partner_id']))
+        with self.assertRaises(ValueError):
+            ComputeSpec(['line_ids'], aggregate='sum', comodel='sale.thing.line', inverse='order_id')
+        for comodel, inverse in (("x'] + __import__('os').system('id') + self.env['y", 'order_id'),
+                                 ('sale.thing.line', 'order id')):
+            with self.assertRaises(ValueError, msg=(comodel, inverse)):
+                ComputeSpec(['line_ids'], aggregate='count', comodel=comodel, inverse=inverse)
+        with self.assertRaises(ValueError):
+            ModelSpec.from_dict({'name': 'm', 'fields': {'a': {'type': 'Char', 'compute': {'depends': ['b']}}}})
+        with self.assertRaises(ValueError):
+            ModelSpec.from_dict({'name': 'm', 'fields': {
+                'n': {'type': 'Integer', 'compute': {
+                    'depends': ['create_uid'], 'aggregate': 'count', 'comodel': 'res.users', 'inverse': 'x_id',
+                }}
+            }})
+
+    def test_field_spec_is_compact(self):
+        first, second = FieldSpec('name', ''.join(['Ch', 'ar'])), FieldSpec('name', ''.join(['Ch', 'ar']))
+        self.assertIs(first.type, second.type)
+        self.assertFalse(hasattr(first, '__dict__'))
+        self.assertLessEqual(sys.getsizeof(first), 32 + 8 * len(FieldSpec.__slots__))
+
+        import tracemalloc
+
+        tracemalloc.start()
+        try:
+            models = []
+            for index in range(100):
+                model = ModelSpec(f'model_{index}')
+                for field_index in range(100):
+                    model.add_field(f'field_{field_index}', 'Char')
+                models.append(model)
+            shared = tracemalloc.get_traced_memory()[0]
+            model = ModelSpec('distinct')
+            for field_index in range(100, 10100):
+                model.add_field(f'field_{field_index}', 'Char')
+            distinct = tracemalloc.get_traced_memory()[0] - shared
+        finally:
+            tracemalloc.stop()
+        self.assertLess(shared / 10000, 100)
+        self.assertLess(distinct / 10000, 250)
+
+    def test_load_module_specs(self):
+        with open('spec.json', 'w') as f:
+            json.dump({'modules': [{'name': 'a'}, {'name': 'b'}]}, f)
+        self.assertEqual([spec['name'] for spec in load_module_specs('spec.json')], ['a', 'b'])
+
+    def test_batch_collects_failures(self):
+        specs = [
+            {'name': 'mod_a', 'models': [{'name': 'model_a', 'fields': {'name': 'Char'}}]},
+            {'models': []},
+            {'name': 'mod_b', 'models': []},
+        ]
+        report = BatchGenerator(specs, jobs=2).run()
+
+        self.assertEqual([result.module_name for result in report.results], ['mod_a', '', 'mod_b'])
+        self.assertEqual(len(report.succeeded), 2)
+        self.assertEqual(len(report.failed), 1)
+        self.assertTrue(os.path.isfile(os.path.join('mod_a', 'models', 'model_a.py')))
+        self.assertGreater(report.modules_per_second, 0)
+
+    def test_batch_resumes_from_journal(self):
+        specs = [
+            {'name': 'mod_a', 'models': [{'name': 'model_a', 'fields': {'name': 'Char'}}]},
+            {'name': 'mod_b', 'models': [{'name': 'model_b', 'fields': {'name': 'Char'}}]},
+            {'name': 'mod_c', 'models': []},
+        ]
+        report = BatchGenerator(specs, jobs=1, journal_path='journal.jsonl').run()
+        self.assertEqual(len(report.resumed), 0)
+
+        # A damaged file, a changed spec and a torn last journal line
+        with open(os.path.join('mod_a', 'models', 'model_a.py'), 'a') as f:
+            f.write('# damaged')
+        specs[2]['models'].append({'name': 'model_c', 'fields': {}})
+        with open('journal.jsonl', 'a') as f:
+            f.write('{"type": "mod')
+
+        report = BatchGenerator(specs, jobs=2, journal_path='journal.jsonl').run()
+
+        self.assertEqual([result.resumed for result in report.results], [False, True, False])
+        self.assertEqual(report.results[1].skipped, 7)
+        self.assertIn("1 already complete in the journal", report.summary())
+        with open(os.path.join('mod_a', 'models', 'model_a.py')) as f:
+            self.assertNotIn('damaged', f.read())
+        # Compacted to the last state: 7 file records and a module record per module
+        with open('journal.jsonl') as f:
+            self.assertEqual(len(f.readlines()), 3 * 8)
+        report = BatchGenerator(specs, jobs=1, journal_path='journal.jsonl').run()
+        self.assertEqual(len(report.resumed), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
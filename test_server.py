@@ -0,0 +1,81 @@
+import io
+import os
+import tempfile
+import threading
+import unittest
+import zipfile
+
+from server import GenerationServer, request
+
+SPEC = {'name': 'test_module', 'models': [{'name': 'test_model', 'fields': {'name': 'Char'}}]}
+
+
+class TestGenerationServer(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.socket_path = os.path.join(self.tmp.name, 'odoo-gen.sock')
+        self.server = GenerationServer(self.socket_path, cache_dir=os.path.join(self.tmp.name, 'cache'), jobs=2)
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+        self.thread.start()
+        self.assertTrue(self.server.ready.wait(5))
+
+    def tearDown(self):
+        self.server.stop()
+        self.thread.join(5)
+        self.tmp.cleanup()
+
+    def test_publish_into_addons_path(self):
+        result = request(self.socket_path, SPEC, addons_path=self.tmp.name)
+
+        self.assertTrue(result['ok'], result)
+        self.assertEqual(result['path'], os.path.join(self.tmp.name, 'test_module'))
+        self.assertEqual(result['written'], 7)
+        self.assertTrue(os.path.isfile(os.path.join(result['path'], 'models', 'test_model.py')))
+
+        result = request(self.socket_path, SPEC, addons_path=self.tmp.name)
+        self.assertEqual((result['written'], result['skipped']), (0, 7))
+
+    def test_streamed_archive(self):
+        target = io.BytesIO()
+
+        result = request(self.socket_path, SPEC, archive_format='zip', target=target)
+
+        self.assertTrue(result['ok'], result)
+        with zipfile.ZipFile(io.BytesIO(target.getvalue())) as archive:
+            self.assertIn(b'fields.Char', archive.read('test_module/models/test_model.py'))
+
+    def test_concurrent_requests(self):
+        results = {}
+
+        def generate(index):
+            spec = dict(SPEC, name=f'module_{index}')
+            results[index] = request(self.socket_path, spec, addons_path=self.tmp.name)
+
+        threads = [threading.Thread(target=generate, args=(index,)) for index in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+
+        self.assertTrue(all(results[index]['ok'] for index in range(6)), results)
+        self.assertEqual(self.server.requests, 6)
+
+    def test_errors(self):
+        self.assertFalse(request(self.socket_path, {'models': []})['ok'])
+        addons_path = os.path.join(self.tmp.name, 'addons')
+        os.makedirs(addons_path)
+        result = request(self.socket_path, {'name': '../escaped', 'models': []}, addons_path=addons_path)
+        self.assertIn("not a valid Python identifier", result['error'])
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, 'escaped')))
+        spec = {'name': 'test_module', 'models': [{'name': '../../escaped', 'fields': {}}]}
+        result = request(self.socket_path, spec, addons_path=addons_path)
+        self.assertIn("not a valid Odoo model name", result['error'])
+        self.assertEqual(os.listdir(addons_path), [])
+        self.assertFalse(os.path.exists(os.path.join(self.tmp.name, 'escaped.py')))
+        result = request(self.socket_path, SPEC, archive_format='rar', target=io.BytesIO())
+        self.assertEqual(result, {'ok': False, 'error': "Unsupported archive format: rar"})
+
+
+if __name__ == '__main__':
+    unittest.main()
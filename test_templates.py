@@ -0,0 +1,108 @@
+import ast
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from odoo_generator import ModelSpec, OdooModuleGenerator, RenderCache
+from templates import Template, TemplateError, TemplateLoader
+
+
+class TestTemplates(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def test_render_statements(self):
+        template = Template(
+            "{% for item in items %}\n"
+            "{% if item > 1 %}\n"
+            "- {{ item }} of {{ len(items) }}\n"
+            "{% else %}\n"
+            "{% set label = name.upper() %}\n"
+            "- {{ label }}\n"
+            "{% endif %}\n"
+            "{% endfor %}\n"
+        )
+        self.assertEqual(template.render(items=[1, 2], name='first'), "- FIRST\n- 2 of 2\n")
+
+    def test_names_bound_by_the_template(self):
+        self.assertEqual(Template("{{ sorted(xs, key=lambda v: -v) }}").render(xs=[1, 3, 2]), "[3, 2, 1]")
+        self.assertEqual(Template("{{ [v * k for v in xs] }} {{ v }}").render(xs=[1, 2], k=3, v='v'), "[3, 6] v")
+        self.assertEqual(Template("{{ x }}{% set x = x + 1 %}{{ x }}").render(x=1), "12")
+
+    def test_invalid_templates(self):
+        for source in ("{% for x in y %}", "{% endif %}", "{{ 1 + }}", "{% include 'x' %}"):
+            with self.assertRaises(TemplateError, msg=source):
+                Template(source)
+
+    def test_compiled_code_is_cached(self):
+        source = "{% for item in items %}{{ item }},{% endfor %}"
+        Template(source, 'items', cache_dir='cache')
+        path, = [os.path.join('cache', name) for name in os.listdir('cache')]
+
+        with mock.patch.object(Template, 'compile_code', side_effect=AssertionError("compiled again")):
+            self.assertEqual(Template(source, 'items', cache_dir='cache').render(items=[1, 2]), "1,2,")
+        Template(source + "!", 'items', cache_dir='cache')
+        self.assertEqual(len(os.listdir('cache')), 2)
+
+        with open(path, 'wb') as f:
+            f.write(b'\0')
+        self.assertEqual(Template(source, 'items', cache_dir='cache').render(items=[3]), "3,")
+
+        with mock.patch.object(Template, 'DISK_CACHE_ENTRIES', 2):
+            Template(source + "?", 'items', cache_dir='cache')
+        self.assertEqual(len(os.listdir('cache')), 2)
+
+    def test_library_does_not_write_compiled_templates(self):
+        with mock.patch.dict(os.environ, {'ODOO_GENERATOR_CACHE_DIR': 'cache'}):
+            generator = OdooModuleGenerator('test_module', templates=TemplateLoader())
+            generator.spec.add_model('test_model')
+            generator.render_files()
+        self.assertFalse(os.path.exists('cache'))
+
+    def test_manifest_is_valid_python(self):
+        generator = OdooModuleGenerator('test_module')
+        generator.spec.add_model('test.model')
+
+        manifest = ast.literal_eval(generator.render_files()[os.path.join('test_module', '__manifest__.py')])
+
+        self.assertEqual(
+            manifest['data'], ['security/ir.model.access.csv', 'views/test.model_views.xml', 'views/menus.xml']
+        )
+
+    def test_override_directory_is_recompiled_on_change(self):
+        os.mkdir('templates')
+        path = os.path.join('templates', 'model.py')
+        with open(path, 'w') as f:
+            f.write("# {{ model.name }}\n")
+        loader = TemplateLoader('templates')
+        cache = RenderCache('cache')
+        generator = OdooModuleGenerator('test_module', cache, templates=loader)
+        generator.spec.models.append(ModelSpec('test_model'))
+        model_path = os.path.join('test_module', 'models', 'test_model.py')
+
+        self.assertEqual(generator.render_files()[model_path], "# test_model\n")
+        compiled = loader.get('model.py')
+        generator.render_files()
+        self.assertIs(loader.get('model.py'), compiled)
+
+        with open(path, 'w') as f:
+            f.write("# {{ model.name.upper() }}\n")
+        os.utime(path, ns=(0, 0))
+        # The render cache is keyed on the template too, so the edit is not masked.
+        self.assertEqual(generator.render_files()[model_path], "# TEST_MODEL\n")
+
+        os.remove(path)
+        self.assertIn("class Test_model(models.Model)", generator.render_files()[model_path])
+        cache.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import json
+import os
+import tempfile
+import unittest
+
+from watch import SpecWatcher
+
+
+class TestSpecWatcher(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+        self.edits = 0
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def save(self, models, text=None):
+        with open('spec.json', 'w') as f:
+            if text is None:
+                json.dump({'name': 'test_module', 'models': models}, f)
+            else:
+                f.write(text)
+        # Successive saves within one mtime tick must still be seen.
+        self.edits += 1
+        stat = os.stat('spec.json')
+        os.utime('spec.json', ns=(stat.st_atime_ns, stat.st_mtime_ns + self.edits * 1000))
+
+    def test_regenerates_only_changed_models(self):
+        watcher = SpecWatcher('spec.json')
+        self.save([{'name': 'model_a', 'fields': {'name': 'Char'}}, {'name': 'model_b', 'fields': {'name': 'Char'}}])
+        update, = watcher.check()
+        self.assertEqual(update.file_manager.written, 9)
+        self.assertEqual(watcher.check(), [])
+
+        manifest = os.path.join('test_module', '__manifest__.py')
+        os.utime(manifest, ns=(0, 0))
+        self.save([{'name': 'model_a', 'fields': {'name': 'Text'}}, {'name': 'model_b', 'fields': {'name': 'Char'}}])
+        update, = watcher.check()
+        self.assertEqual([model.name for model in update.changes.changed], ['model_a'])
+        self.assertFalse(update.changes.models_changed)
+        self.assertEqual(update.file_manager.written + update.file_manager.skipped, 2)
+        self.assertEqual(os.stat(manifest).st_mtime_ns, 0)
+        with open(os.path.join('test_module', 'models', 'model_a.py')) as f:
+            self.assertIn('fields.Text', f.read())
+        self.assertGreater(update.latency, 0)
+        self.assertIn('1 models regenerated', update.summary())
+
+        self.save([{'name': 'model_a', 'fields': {'name': 'Text'}}, {'name': 'model_c', 'fields': {'name': 'Char'}}])
+        update, = watcher.check()
+        self.assertEqual(update.changes.removed, ['model_b'])
+        self.assertEqual(update.file_manager.removed, 2)
+        self.assertFalse(os.path.exists(os.path.join('test_module', 'models', 'model_b.py')))
+        with open(manifest) as f:
+            self.assertIn('model_c_views.xml', f.read())
+        with open(os.path.join('test_module', '.generator_hashes.json')) as f:
+            self.assertNotIn('models/model_b.py', json.load(f))
+
+        # Targeting another Odoo version regenerates every model
+        with open('spec.json') as f:
+            spec = json.load(f)
+        self.save(None, text=json.dumps(dict(spec, odoo_version=17)))
+        update, = watcher.check()
+        self.assertEqual([model.name for model in update.changes.changed], ['model_a', 'model_c'])
+        with open(os.path.join('test_module', 'views', 'model_c_views.xml')) as f:
+            self.assertIn('<field name="view_mode">tree,form</field>', f.read())
+
+    def test_keeps_previous_spec_on_error(self):
+        watcher = SpecWatcher('spec.json')
+        self.save([{'name': 'model_a', 'fields': {'name': 'Char'}}])
+        watcher.check()
+
+        self.save(None, text='{"name": "test_module", "mod')
+        update, = watcher.check()
+        self.assertIn('not reloaded', update.summary())
+
+        self.save([{'name': 'model_a', 'fields': {'name': 'Char'}}])
+        self.assertEqual(watcher.check(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import os
+import time
+
+from odoo_generator import ModuleSpec, OdooModuleGenerator, load_module_specs
+
+
+class WatchUpdate:
+    """Outcome of regenerating one module after its spec file changed.
+
+    ``latency`` runs from the spec file's mtime, i.e. the edit, to the last
+    file being written; ``duration`` is the regeneration alone.
+    """
+
+    def __init__(self, module_name, changes=None, file_manager=None, duration=0.0, latency=0.0, error=None):
+        self.module_name = module_name
+        self.changes = changes
+        self.file_manager = file_manager
+        self.duration = duration
+        self.latency = latency
+        self.error = error
+
+    def summary(self):
+        if self.error is not None:
+            return f"{self.module_name}: {self.error}"
+        changes = self.changes
+        file_manager = self.file_manager
+        rebuilt = ", module files rebuilt" if changes.models_changed else ""
+        return (
+            f"{self.module_name}: {len(changes.changed)} models regenerated, {len(changes.removed)} removed{rebuilt}; "
+            f"{file_manager.written} files written, {file_manager.removed} deleted in {self.duration * 1000:.1f} ms "
+            f"({self.latency * 1000:.0f} ms after the edit)."
+        )
+
+
+class SpecWatcher:
+    """Regenerates the modules of a spec file each time the file changes.
+
+    The file is polled with ``stat`` every ``interval`` seconds, which also
+    catches editors that save by renaming a new file over the old one. Each
+    change is compared with the previous version of every module's spec and
+    only what differs is regenerated (see ``OdooModuleGenerator.update``).
+    A spec that fails to load, e.g. half-saved, is reported and the previous
+    one is kept until the next change.
+    """
+
+    def __init__(self, spec_path, module=None, render_cache=None, templates=None, interval=0.25):
+        self.spec_path = spec_path
+        self.module = module
+        self.render_cache = render_cache
+        self.templates = templates
+        self.interval = interval
+        self.specs = {}
+        self._signature = None
+
+    def changed(self):
+        try:
+            stat = os.stat(self.spec_path)
+        except OSError:
+            # Mid-rename while an editor saves: look again on the next poll.
+            return None
+        signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        if signature == self._signature:
+            return None
+        self._signature = signature
+        return stat.st_mtime_ns
+
+    def check(self):
+        """Regenerate what changed since the last call; returns a list of ``WatchUpdate``."""
+        edited = self.changed()
+        if edited is None:
+            return []
+        try:
+            specs = [ModuleSpec.from_dict(spec) for spec in load_module_specs(self.spec_path)]
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            return [WatchUpdate(self.spec_path, error=f"not reloaded: {e}")]
+        if self.module is not None:
+            specs = [spec for spec in specs if spec.name == self.module]
+
+        updates = []
+        for spec in specs:
+            previous = self.specs.get(spec.name)
+            if previous == spec:
+                continue
+            start = time.perf_counter()
+            generator = OdooModuleGenerator.from_spec(spec, self.render_cache, templates=self.templates)
+            try:
+                file_manager, changes = generator.update(previous)
+            except Exception as e:
+                updates.append(WatchUpdate(spec.name, error=str(e)))
+                continue
+            self.specs[spec.name] = spec
+            updates.append(WatchUpdate(
+                spec.name, changes, file_manager, time.perf_counter() - start, (time.time_ns() - edited) / 1e9,
+            ))
+        return updates
+
+    def run(self, callback, stop=None):
+        """Poll until ``stop`` (a ``threading.Event``) is set, passing every update to ``callback``."""
+        while stop is None or not stop.is_set():
+            for update in self.check():
+                callback(update)
+            if stop is None:
+                time.sleep(self.interval)
+            else:
+                stop.wait(self.interval)